@@ -0,0 +1 @@
+# Performance benchmarks; see benchmarks/run.py.
@@ -0,0 +1,278 @@
+# benchmarks/loadtest.py
+#
+# Concurrent-session load test, in two parts.
+#
+# Page journeys: each simulated analyst is a Streamlit session (AppTest) in
+# its own process. AppTest installs and clears a process-global Runtime on
+# every run, so sessions cannot share a process; separate processes behave
+# like server replicas sharing the on-disk caches under .cache. Each process
+# warms its own caches first (not timed), then repeats the journey
+#
+#   landing -> pick Egypt -> run forecast -> decomposition -> food prices -> subsidies
+#   -> impulse responses
+#
+# and the run reports p50/p95/p99 rerun latency per step, throughput and the
+# peak RSS of a session process.
+#
+# Shared objects: threads in this process hammer the st.cache_resource
+# objects the pages use (forecast store, zoo, vintages, state-space
+# forecasts) the way concurrent reruns of one server would. Shared objects
+# are fingerprinted before and after, and every call (and every session)
+# that asked for the same scenario must see the same forecast; anything else
+# is flagged as a thread-safety problem. External data comes from
+# benchmarks/stubs.
+#
+#   python -m benchmarks.loadtest --sessions 20 --iterations 3 --threads 16
+
+import argparse
+import hashlib
+import multiprocessing
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'benchmarks', 'stubs'), ROOT]
+# Commodity bars from the stub go to their own store, not the app's
+os.environ.setdefault('NOWCAST_COMMODITY_DB', os.path.join(ROOT, '.cache', 'bench', 'commodities.sqlite'))
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from nowcast import app, warmup
+
+SCENARIOS = [(0.0, 0.0), (2.0, 1.0), (5.0, 2.5), (-1.0, 0.5)]
+STEPS = ['landing', 'pick_egypt', 'run_forecast', 'decomposition', 'food_prices', 'subsidies',
+         'impulse_responses']
+WARMUP_TIMEOUT = 600  # seconds for every session process to warm up
+
+# ------------------------------------------------------------------------------
+# Shared-object fingerprints
+# ------------------------------------------------------------------------------
+def _digest(*arrays):
+    h = hashlib.sha1()
+    for a in arrays:
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()[:16]
+
+def shared_fingerprints():
+    model, df_hist = app.load_and_train()
+    ctx = app.forecast_context()
+    return {
+        'model': _digest(model.named_steps['ridge'].coef_, model.named_steps['scaler'].mean_),
+        'df_hist': _digest(pd.util.hash_pandas_object(df_hist, index=True).to_numpy()),
+        'forecast_context': _digest(ctx['coefs'][1], np.array(ctx['state'])),
+    }
+
+# ------------------------------------------------------------------------------
+# One analyst session
+# ------------------------------------------------------------------------------
+class Session:
+    def __init__(self, idx, iterations, results):
+        self.idx = idx
+        self.iterations = iterations
+        self.results = results
+
+    def _step(self, name, at):
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+        error = str(at.exception[0].value) if at.exception else None
+        self.results.record(name, elapsed, error)
+        return at
+
+    def journey(self, exrg, gi):
+        at = AppTest.from_file(os.path.join(ROOT, 'Data Exploration.py'), default_timeout=120)
+        at.session_state['authenticated'] = True
+        self._step('landing', at)
+        at.radio(key='country_pick').set_value('Egypt')
+        self._step('pick_egypt', at)
+
+        at.switch_page('pages/01_Nowcasting Food Bill.py')
+        at.run()
+        at.sidebar.number_input[0].set_value(exrg)
+        at.sidebar.number_input[1].set_value(gi)
+        at.sidebar.button[0].click()
+        self._step('run_forecast', at)
+        if 'scenario' in at.session_state:
+            entry = app.forecast_store().get(at.session_state['scenario'])
+            if entry is not None:
+                self.results.forecast_seen((exrg, gi), entry['df_fc']['Inflation'].to_numpy())
+
+        for step, page in [('decomposition', 'pages/02_Decomposition.py'),
+                           ('food_prices', 'pages/03_Food Prices.py'),
+                           ('subsidies', 'pages/04_Subsidies.py'),
+                           ('impulse_responses', 'pages/05_Impulse Responses.py')]:
+            at.switch_page(page)
+            self._step(step, at)
+
+    def run(self):
+        for i in range(self.iterations):
+            exrg, gi = SCENARIOS[(self.idx + i) % len(SCENARIOS)]
+            try:
+                self.journey(exrg, gi)
+            except Exception as e:
+                self.results.record('journey', 0.0, f"{type(e).__name__}: {e}")
+
+# ------------------------------------------------------------------------------
+# Results
+# ------------------------------------------------------------------------------
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.errors = []
+        self.forecasts = defaultdict(set)
+
+    def record(self, step, seconds, error=None):
+        with self._lock:
+            self.latency[step].append(seconds)
+            if error:
+                self.errors.append(f"{step}: {error}")
+
+    def error(self, step, error):
+        with self._lock:
+            self.errors.append(f"{step}: {error}")
+
+    def forecast_seen(self, scenario, values):
+        with self._lock:
+            self.forecasts[scenario].add(_digest(np.round(values, 9)))
+
+    def merge(self, other):
+        with self._lock:
+            for step, samples in other.latency.items():
+                self.latency[step].extend(samples)
+            self.errors.extend(other.errors)
+            for scenario, digests in other.forecasts.items():
+                self.forecasts[scenario] |= digests
+
+def percentiles(samples):
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if samples else (0.0, 0.0, 0.0)
+    return {'n': len(samples), 'p50_ms': p50 * 1000, 'p95_ms': p95 * 1000, 'p99_ms': p99 * 1000}
+
+# ------------------------------------------------------------------------------
+# Session processes
+# ------------------------------------------------------------------------------
+def _init_session_process():
+    os.chdir(ROOT)
+    warmup.warm()
+    Session(0, 1, Results()).run()  # first journey compiles the page scripts
+
+def _session_process(idx, iterations, barrier):
+    barrier.wait()  # every process is warm before the timed journeys start
+    results = Results()
+    Session(idx, iterations, results).run()
+    return (dict(results.latency), results.errors, dict(results.forecasts),
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+def run_sessions(n_sessions, iterations):
+    # (results, wall seconds, peak RSS MB of a session process)
+    results, peak_rss = Results(), 0.0
+    with multiprocessing.Manager() as manager:
+        barrier = manager.Barrier(n_sessions + 1)
+        with ProcessPoolExecutor(n_sessions, initializer=_init_session_process) as pool:
+            futures = [pool.submit(_session_process, i, iterations, barrier) for i in range(n_sessions)]
+            # A process that dies while warming never reaches the barrier;
+            # time out so its error surfaces from fut.result() instead of hanging
+            try:
+                barrier.wait(WARMUP_TIMEOUT)
+            except threading.BrokenBarrierError:
+                pass
+            start = time.perf_counter()
+            for fut in futures:
+                other = Results()
+                latency, other.errors, forecasts, rss = fut.result()
+                other.latency.update(latency)
+                other.forecasts.update(forecasts)
+                results.merge(other)
+                peak_rss = max(peak_rss, rss)
+            wall = time.perf_counter() - start
+    return results, wall, peak_rss
+
+# ------------------------------------------------------------------------------
+# Shared objects under concurrent access (one process, many threads)
+# ------------------------------------------------------------------------------
+def _hammer(idx, iterations, results):
+    for i in range(iterations):
+        exrg, gi = SCENARIOS[(idx + i) % len(SCENARIOS)]
+        try:
+            _, entry = app.compute_forecast(exrg, gi)
+            results.forecast_seen((exrg, gi), entry['df_fc']['Inflation'].to_numpy())
+            app.zoo_forecast(exrg, gi)
+            app.long_horizon_forecast(exrg, gi, 120)
+            app.vintage_forecast(app.vintage_store().index[-1], exrg, gi)
+        except Exception as e:
+            results.error('shared', f"{type(e).__name__}: {e}")
+
+def run_shared(n_threads, iterations, results):
+    threads = [threading.Thread(target=_hammer, args=(i, iterations, results), name=f'shared-{i}')
+               for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+def run(n_sessions, iterations, n_threads=16):
+    os.chdir(ROOT)
+    # Warm the shared caches once so fingerprints compare like with like
+    warmup.warm()
+    before = shared_fingerprints()
+    shared = Results()
+    run_shared(n_threads, 10 * iterations, shared)
+    after = shared_fingerprints()
+
+    results, wall, peak_rss = run_sessions(n_sessions, iterations)
+    results.merge(shared)
+    issues = [f"shared object '{k}' changed during the run ({before[k]} -> {after[k]})"
+              for k in before if before[k] != after[k]]
+    issues += [f"scenario {s} produced {len(d)} different forecasts across sessions"
+               for s, d in results.forecasts.items() if len(d) > 1]
+
+    reruns = sum(len(v) for v in results.latency.values())
+    return {
+        'sessions': n_sessions,
+        'iterations': iterations,
+        'threads': n_threads,
+        'wall_s': wall,
+        'throughput_reruns_per_s': reruns / wall if wall else 0.0,
+        'peak_rss_mb': peak_rss,
+        'steps': {step: percentiles(results.latency[step]) for step in STEPS if step in results.latency},
+        'all_reruns': percentiles([s for v in results.latency.values() for s in v]),
+        'errors': results.errors,
+        'thread_safety_issues': issues,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent analyst sessions.")
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=2, help="journeys per session")
+    parser.add_argument('--threads', type=int, default=16, help="threads on the shared objects")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args.sessions, args.iterations, args.threads)
+    print(f"{report['sessions']} sessions x {report['iterations']} journeys in {report['wall_s']:.1f} s, "
+          f"{report['throughput_reruns_per_s']:.1f} reruns/s, peak RSS {report['peak_rss_mb']:.0f} MB per session process")
+    for step, p in list(report['steps'].items()) + [('ALL', report['all_reruns'])]:
+        print(f"  {step:<14} n={p['n']:<5} p50 {p['p50_ms']:>8.1f} ms  p95 {p['p95_ms']:>8.1f} ms  p99 {p['p99_ms']:>8.1f} ms")
+    for line in report['errors'][:20]:
+        print(f"ERROR {line}")
+    for line in report['thread_safety_issues']:
+        print(f"THREAD-SAFETY {line}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['errors'] or report['thread_safety_issues'] else 0
+
+if __name__ == '__main__':
+    # Go through the package module: AppTest swaps sys.modules['__main__'] for
+    # the page script in the workers, so pool tasks pickled by reference to
+    # __main__ could not be found there
+    from benchmarks.loadtest import main as _main
+    sys.exit(_main())
@@ -0,0 +1,381 @@
+# benchmarks/run.py
+#
+# Performance benchmarks: workbook loaders, the forecast recursion (single and
+# batched), chart builds for every page and full headless page reruns through
+# Streamlit's AppTest harness (with benchmarks/stubs standing in for yfinance).
+#
+#   python -m benchmarks.run                    # compare against baseline.json
+#   python -m benchmarks.run --update-baseline  # record a new baseline
+#   python -m benchmarks.run -k page_           # only names containing 'page_'
+#
+# Each benchmark reports the median wall time over its repeats and the peak
+# traced allocation of one extra run. The run exits non-zero when either
+# figure regresses past the thresholds relative to the stored baseline.
+#
+# Every on-disk cache (feature store, model artifacts, vintages, ready.json,
+# commodity bars) goes to a throwaway directory, so a run never touches the
+# app's .cache, and the commodity refresh thread is not started: the bar store
+# is filled once from the stub before anything is timed.
+#
+# benchmarks/baseline.json is committed. Timings are machine-specific: a CI
+# job should first record a baseline on its own runner from the base branch
+# (--update-baseline), then check out the change and run the comparison.
+
+import argparse
+import functools
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+LATEST_PATH = os.path.join(ROOT, 'benchmarks', 'latest.json')
+
+# Stubs first (yfinance), then the repository (nowcast, page scripts)
+sys.path[:0] = [STUBS, ROOT]
+# All caches in a throwaway directory (set before nowcast reads it on import)
+CACHE_TMP = tempfile.TemporaryDirectory(prefix='nowcast-bench-')
+os.environ['NOWCAST_CACHE_DIR'] = CACHE_TMP.name
+os.environ['NOWCAST_COMMODITY_DB'] = os.path.join(CACHE_TMP.name, 'commodities.sqlite')
+
+import numpy as np
+import pandas as pd
+
+from nowcast import (catalog, charts, commodities, data, export, features, flags, food_bill,
+                     model as nc_model, pipeline, statespace, vintages, zoo)
+from nowcast.aggregates import Aggregates
+
+BENCHMARKS = {}
+
+def bench(name, repeat=10):
+    def register(fn):
+        BENCHMARKS[name] = (fn, repeat)
+        return fn
+    return register
+
+# ------------------------------------------------------------------------------
+# Shared inputs, built once outside the timed region
+# ------------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def fixtures():
+    df_hist = data.load_training_frame()
+    model = nc_model.train_model(df_hist)
+    df_fc = nc_model.forecast_frame(model, df_hist, 2.0, 1.0)
+    food_prices_df = food_bill.adjust_food_prices(data.load_food_prices(),
+                                                  food_bill.average_inflation(df_fc))
+    rng = np.random.default_rng(0)
+    df_infl = data.load_inflation()
+    hist = Aggregates(df_hist, date_col='Year')
+    return {
+        'df_hist': df_hist,
+        'hist_avg': hist.yearly_mean('Egypt Inflation', 'Inflation'),
+        'hist_monthly': hist.last_year_monthly('Egypt Inflation', 'Inflation'),
+        'infl_aggregates': Aggregates(df_infl),
+        'model': model,
+        'coefs': nc_model.linear_coefficients(model),
+        'state': nc_model.initial_state(df_hist),
+        'zoo': zoo.train(df_hist, workers=1),
+        'zoo_state': zoo.initial_state(df_hist),
+        'vintages': vintages.build(df_hist),
+        'df_fc': df_fc,
+        'df_infl': df_infl,
+        'df_sub_imp_nir': data.load_sub_imp_nir(),
+        'contributions': data.load_contributions(),
+        'food_prices_df': food_prices_df,
+        'export_ctx': export.export_context(pipeline.load_context()),
+        'scenario_chunk': pd.DataFrame({'scenario_id': np.arange(1000),
+                                        'Exchange Rate Growth': rng.normal(1.0, 2.0, 1000),
+                                        'Global Inflation': rng.normal(0.5, 1.0, 1000)}),
+        'exrg_paths': rng.normal(1.0, 2.0, (10000, nc_model.N_PERIODS)),
+        'gi_paths': rng.normal(0.5, 1.0, (10000, nc_model.N_PERIODS)),
+        'commodity_data': {name: {'price': 100.0 + i, 'change': (-1) ** i * 0.5}
+                           for i, name in enumerate(['Rice', 'Wheat', 'Maize', 'Soybeans',
+                                                     'Soybean Oil', 'Soybean Meal', 'Sugar',
+                                                     'Beef', 'Oranges', 'Coffee', 'Cocoa'])},
+    }
+
+# ------------------------------------------------------------------------------
+# Loaders
+# ------------------------------------------------------------------------------
+@bench('ingest_features', 5)
+def _():
+    # Full ingest into a throwaway store, never the app's .cache/features
+    with tempfile.TemporaryDirectory() as store_dir:
+        features.ingest(store_dir=store_dir)
+
+@bench('load_training_frame', 3)
+def _():
+    data.load_training_frame()
+
+@bench('load_food_prices', 3)
+def _():
+    data.load_food_prices()
+
+@bench('load_contributions', 3)
+def _():
+    data.load_contributions()
+
+@bench('load_inflation', 3)
+def _():
+    data.load_inflation()
+
+@bench('load_sub_imp_nir', 3)
+def _():
+    data.load_sub_imp_nir()
+
+@bench('commodity_latest', 20)
+def _():
+    commodities.latest()
+
+@bench('load_series_projected', 10)
+def _():
+    catalog.load(['macro/Egypt Inflation', 'sub_imp_nir/Food Imports'])
+
+@bench('history_aggregates', 10)
+def _():
+    Aggregates(fixtures()['df_hist'], date_col='Year')
+
+# ------------------------------------------------------------------------------
+# Model
+# ------------------------------------------------------------------------------
+@bench('train_model', 5)
+def _():
+    nc_model.train_model(fixtures()['df_hist'])
+
+@bench('forecast_single', 50)
+def _():
+    fx = fixtures()
+    nc_model.forecast_frame(fx['model'], fx['df_hist'], 2.0, 1.0)
+
+@bench('forecast_batched_10k', 10)
+def _():
+    fx = fixtures()
+    nc_model.forecast_batch(fx['coefs'], fx['state'], fx['exrg_paths'], fx['gi_paths'])
+
+@bench('statespace_forecast_10k_h120', 10)
+def _():
+    # 10,000 flat scenarios, every month out to 10 years, closed form
+    fx = fixtures()
+    statespace.forecast_at(fx['coefs'], fx['state'], fx['exrg_paths'][:, 0], fx['gi_paths'][:, 0],
+                           range(1, 121))
+
+@bench('impulse_responses_120', 50)
+def _():
+    statespace.impulse_responses(fixtures()['coefs'], 120, permanent=True)
+
+@bench('build_vintages', 5)
+def _():
+    # Every as-of fit from scratch
+    vintages.build(fixtures()['df_hist'])
+
+@bench('extend_vintages_one_month', 20)
+def _():
+    # A new month on top of the stored vintages
+    fx = fixtures()
+    vintages.build(fx['df_hist'], fx['vintages'].iloc[:-1])
+
+@bench('vintage_replay', 50)
+def _():
+    fx = fixtures()
+    indexed = vintages.index(fx['vintages'])
+    vintages.forecast(vintages.as_of(indexed, indexed.index[len(indexed) // 2]), 2.0, 1.0)
+
+@bench('train_zoo', 3)
+def _():
+    zoo.train(fixtures()['df_hist'])
+
+@bench('forecast_zoo_10k', 10)
+def _():
+    fx = fixtures()
+    zoo.forecast(fx['zoo'], fx['zoo_state'], fx['exrg_paths'], fx['gi_paths'])
+
+@bench('export_tables_1k', 10)
+def _():
+    fx = fixtures()
+    export.evaluate_tables(fx['export_ctx'], fx['scenario_chunk'])
+
+@bench('export_workbook_single', 10)
+def _():
+    fx = fixtures()
+    export.write(fx['export_ctx'], [fx['scenario_chunk'].iloc[:1]], export.ExcelWriter(io.BytesIO()),
+                 contributions=fx['contributions'])
+
+# ------------------------------------------------------------------------------
+# Chart builds (including serialization, as Streamlit would do)
+# ------------------------------------------------------------------------------
+@bench('echarts_inflation', 20)
+def _():
+    fx = fixtures()
+    df = fx['df_infl']
+    json.dumps(charts.add_inflation_annotations(charts.echarts_options(df, 'Inflation'), df, fx['infl_aggregates']))
+
+@bench('echarts_custom', 20)
+def _():
+    df = catalog.load(['macro/Egypt Inflation', 'sub_imp_nir/Food Imports'])
+    json.dumps(charts.custom_echarts_options(df, {'Egypt Inflation': 'Left', 'Food Imports': 'Right'}))
+
+@bench('echarts_sub_imp_nir', 20)
+def _():
+    json.dumps(charts.echarts_options(fixtures()['df_sub_imp_nir'], 'Subsidies & Imports & Reserves/Import Ratio'))
+
+@bench('ticker_html', 50)
+def _():
+    charts.ticker_html(fixtures()['commodity_data'])
+
+@bench('flag_grid_html', 5)
+def _():
+    flags.grid_html()
+
+@bench('altair_yearly', 10)
+def _():
+    fx = fixtures()
+    charts.yearly_chart(fx['hist_avg'], fx['df_fc']).to_dict()
+
+@bench('altair_monthly', 10)
+def _():
+    fx = fixtures()
+    charts.monthly_chart(fx['hist_monthly'], fx['df_fc']).to_dict()
+
+@bench('plotly_decomposition', 10)
+def _():
+    charts.decomposition_figure(fixtures()['contributions'].iloc[-1]).to_json()
+
+@bench('plotly_food_prices', 10)
+def _():
+    charts.food_prices_figure(fixtures()['food_prices_df'], 2025).to_json()
+
+@bench('plotly_subsidies', 10)
+def _():
+    subsidy = food_bill.subsidy_value(food_bill.average_inflation(fixtures()['df_fc']))
+    charts.subsidy_figure(subsidy).to_json()
+
+# ------------------------------------------------------------------------------
+# Full page reruns (headless)
+# ------------------------------------------------------------------------------
+def run_page(script, **session_state):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=120)
+    for key, value in session_state.items():
+        at.session_state[key] = value
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{script} raised: {at.exception[0].value}")
+    return at
+
+@bench('page_landing', 3)
+def _():
+    run_page('Data Exploration.py', authenticated=True)
+
+@bench('page_landing_pick', 3)
+def _():
+    # Landing page until the explorer is up: first render + picking a country
+    at = run_page('Data Exploration.py', authenticated=True)
+    at.radio(key='country_pick').set_value('Egypt').run()
+
+@bench('page_explorer', 3)
+def _():
+    run_page('Data Exploration.py', authenticated=True, country='Egypt')
+
+@bench('page_nowcasting', 3)
+def _():
+    run_page('pages/01_Nowcasting Food Bill.py', authenticated=True, country='Egypt', run_forecast=True)
+
+@bench('page_decomposition', 3)
+def _():
+    run_page('pages/02_Decomposition.py', authenticated=True, country='Egypt')
+
+@bench('page_food_prices', 3)
+def _():
+    run_page('pages/03_Food Prices.py', authenticated=True, country='Egypt')
+
+@bench('page_subsidies', 3)
+def _():
+    run_page('pages/04_Subsidies.py', authenticated=True, country='Egypt')
+
+@bench('page_impulse_responses', 3)
+def _():
+    run_page('pages/05_Impulse Responses.py', authenticated=True, country='Egypt')
+
+# ------------------------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------------------------
+def measure(fn, repeat):
+    fn()  # warm-up: imports, Streamlit caches, fixtures
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'median_s': statistics.median(times), 'min_s': min(times),
+            'repeat': repeat, 'peak_mb': peak / 1e6}
+
+def compare(results, baseline, time_threshold, mem_threshold):
+    # Small absolute floors keep timer noise on sub-millisecond runs from failing
+    failures = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if r['median_s'] > base['median_s'] * (1 + time_threshold) and r['median_s'] - base['median_s'] > 0.001:
+            failures.append(f"{name}: median {r['median_s'] * 1000:.2f} ms vs baseline {base['median_s'] * 1000:.2f} ms")
+        if r['peak_mb'] > base['peak_mb'] * (1 + mem_threshold) and r['peak_mb'] - base['peak_mb'] > 0.5:
+            failures.append(f"{name}: peak {r['peak_mb']:.2f} MB vs baseline {base['peak_mb']:.2f} MB")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks.")
+    parser.add_argument('-k', '--filter', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--time-threshold', type=float, default=0.25, help="allowed median-time regression (0.25 = 25%%)")
+    parser.add_argument('--mem-threshold', type=float, default=0.25, help="allowed peak-memory regression")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)  # workbook paths are relative to the repository root
+    # Fill the bar store from the stub and warm the shared caches up front, so
+    # no background thread (warm-up or commodity refresh) runs while benchmarks
+    # are timed
+    from nowcast import warmup
+    commodities.update(commodities.YahooSource())
+    warmup.warm(skip={'commodity_refresh'})
+    results = {}
+    for name, (fn, repeat) in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(fn, repeat)
+        r = results[name]
+        print(f"{name:<24} {r['median_s'] * 1000:>10.2f} ms  {r['peak_mb']:>8.2f} MB")
+
+    with open(LATEST_PATH, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    if args.update_baseline:
+        baseline.update(results)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {BASELINE_PATH}")
+        return 0
+    if not baseline:
+        print("No baseline yet; run with --update-baseline to record one.")
+        return 0
+
+    failures = compare(results, baseline, args.time_threshold, args.mem_threshold)
+    for line in failures:
+        print(f"REGRESSION {line}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,34 @@
+# benchmarks/stubs/yfinance.py
+#
+# Offline stand-in for yfinance, put first on sys.path by the benchmarks and
+# the load test so page reruns never touch the network. Prices are fixed per
+# symbol so runs are comparable.
+
+import numpy as np
+import pandas as pd
+
+PRICES = {
+    "ZR=F": 17.45, "ZW=F": 545.25, "ZC=F": 421.50,
+    "ZS=F": 1012.75, "ZL=F": 48.90, "ZM=F": 298.40,
+    "SB=F": 18.62, "LE=F": 221.35, "OJ=F": 262.10,
+    "KC=F": 389.80, "CC=F": 8120.00,
+}
+
+class Ticker:
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        price = PRICES.get(self.symbol, 100.0)
+        return {"regularMarketPrice": price, "previousClose": round(price * 0.99, 2)}
+
+    def history(self, period=None, interval='1d', start=None, **kwargs):
+        # Business-day bars up to a fixed end date, ending at the fixed price
+        dates = pd.bdate_range(end='2025-06-30', periods=260, name='Date')
+        if start is not None:
+            dates = dates[dates >= pd.Timestamp(start)]
+        price = PRICES.get(self.symbol, 100.0)
+        close = price * (1 + 0.01 * np.sin(np.arange(-len(dates) + 1, 1) / 5.0))
+        return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                             'Close': close, 'Volume': 1000.0}, index=dates)
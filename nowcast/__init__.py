@@ -0,0 +1 @@
+# Shared nowcasting logic used by the Streamlit pages and the headless tools.
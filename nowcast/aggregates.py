@@ -0,0 +1,88 @@
+# nowcast/aggregates.py
+#
+# Materialized aggregates of a monthly history: yearly means, the last
+# historical year's months and per-column min/max. Built once when the data is
+# loaded and cached next to it, so reruns only aggregate the forecast. New
+# months are folded in with append() / extended() without rescanning the
+# history.
+
+import copy
+
+import pandas as pd
+
+class Aggregates:
+    def __init__(self, df, date_col=None):
+        # df: monthly rows, dated by `date_col` or by a DatetimeIndex
+        self.date_col = date_col
+        self.columns = [c for c in df.columns
+                        if c != date_col and pd.api.types.is_numeric_dtype(df[c])]
+        self._sums = pd.DataFrame(columns=self.columns, dtype='float64')
+        self._counts = pd.DataFrame(columns=self.columns, dtype='float64')
+        self._min = pd.Series(dtype='float64')
+        self._max = pd.Series(dtype='float64')
+        self._last_year = None
+        self._source = df.iloc[:0]
+        self.append(df)
+
+    def _dates(self, df):
+        return pd.DatetimeIndex(df[self.date_col] if self.date_col else df.index)
+
+    def append(self, df):
+        # Fold new months into the aggregates (in place)
+        self._fold(df)
+        self._source = pd.concat([self._source, df]) if len(self._source) else df
+        return self
+
+    def extended(self, df):
+        # Aggregates of df. When df continues the frame these were built from,
+        # only its new rows are folded in, on a copy (cached instances are
+        # shared by sessions); when earlier rows changed, a full build.
+        n = len(self._source)
+        if not n or len(df) < n or not df.iloc[:n].equals(self._source):
+            return Aggregates(df, self.date_col)
+        out = copy.copy(self)
+        out._fold(df.iloc[n:])
+        out._source = df
+        return out
+
+    def _fold(self, df):
+        # Every update assigns new frames, so copies never share mutations
+        dates = self._dates(df)
+        values = df[self.columns].astype('float64')
+        values.index = dates
+        if values.empty:
+            return
+
+        # Yearly sums and counts, so means stay exact as months arrive
+        by_year = values.groupby(dates.year)
+        self._sums = self._sums.add(by_year.sum(), fill_value=0)
+        self._counts = self._counts.add(by_year.count(), fill_value=0)
+        self.yearly = self._sums / self._counts
+        self.yearly.index.name = 'Year'
+
+        self._min = values.min() if self._min.empty else pd.concat([self._min, values.min()], axis=1).min(axis=1)
+        self._max = values.max() if self._max.empty else pd.concat([self._max, values.max()], axis=1).max(axis=1)
+
+        # Months of the latest year
+        newest = dates.year.max()
+        new_rows = values[dates.year == newest]
+        if self._last_year is None or newest > self._last_year.index.year.max():
+            self._last_year = new_rows
+        elif newest == self._last_year.index.year.max():
+            self._last_year = pd.concat([self._last_year, new_rows]).sort_index()
+
+    # --------------------------------------------------------------------------
+    # Read side (no aggregation work)
+    # --------------------------------------------------------------------------
+    def yearly_mean(self, col, name=None):
+        # DataFrame[Year (int), name or col]
+        return self.yearly[[col]].rename(columns={col: name or col}).reset_index()
+
+    def last_year_monthly(self, col, name=None):
+        # DataFrame[date column or 'Year' (Timestamp), name or col]
+        out = self._last_year[[col]].rename(columns={col: name or col})
+        out.index.name = self.date_col or 'Year'
+        return out.reset_index()
+
+    def extent(self, col):
+        return float(self._min[col]), float(self._max[col])
@@ -0,0 +1,340 @@
+# nowcast/app.py
+#
+# Streamlit-side access to the model and the shared forecast store. Pages
+# reference a forecast through the 'scenario' query parameter (plus 'exrg' and
+# 'gi', so a link still works if the store was cleared) instead of handing
+# frames to each other through session_state.
+
+import functools
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from nowcast import (catalog, charts, commodities, data, export, features, flags, metrics, model as nc_model,
+                     pipeline, profiling, statespace, vintages, zoo)
+from nowcast.aggregates import Aggregates
+from nowcast.cache import ResultCache, SpecCache, context_version, scenario_key, spec_key
+from nowcast.store import ForecastStore
+
+# ------------------------------------------------------------------------------
+# Cached resources (shared by every session)
+# ------------------------------------------------------------------------------
+# Everything derived from the feature store is cached per store version, so a
+# month appended with `python -m nowcast.features --append` reaches the model,
+# zoo, vintages, aggregates and explorer together on the next rerun.
+def feature_version():
+    return features.ensure()['version']
+
+def on_feature_version(cached):
+    # cached(version, *args) -> fn(*args, version=None); None is the current
+    # version. Cached bodies pass theirs on, so one build never mixes versions.
+    @functools.wraps(cached)
+    def wrapper(*args, version=None):
+        return cached(version or feature_version(), *args)
+    wrapper.clear = cached.clear
+    return wrapper
+
+@on_feature_version
+@metrics.track_cache('load_and_train', st.cache_resource(show_spinner=False, max_entries=2))
+def load_and_train(version):
+    df = data.load_training_frame(version)
+    model = nc_model.train_model(df)
+    return model, df
+
+@st.cache_resource(show_spinner=False)
+def _aggregate_bases():
+    # name -> latest Aggregates built; the next feature-store version extends it
+    return {}
+
+def _aggregates(name, df, date_col=None):
+    # Appended months are folded into the previous version's aggregates
+    # instead of aggregating the whole history again
+    bases = _aggregate_bases()
+    base = bases.get(name)
+    aggs = base.extended(df) if base is not None else Aggregates(df, date_col)
+    bases[name] = aggs
+    return aggs
+
+@on_feature_version
+@metrics.track_cache('history_aggregates', st.cache_resource(show_spinner=False, max_entries=2))
+def history_aggregates(version):
+    # Yearly means / last-year months of the training history
+    _, df_hist = load_and_train(version=version)
+    return _aggregates('history', df_hist, date_col='Year')
+
+@on_feature_version
+@metrics.track_cache('model_zoo', st.cache_resource(show_spinner=False, max_entries=2))
+def model_zoo(version):
+    # Coefficient artifacts of every zoo model (refitted only when the feature
+    # store changed) plus the starting lags
+    _, df_hist = load_and_train(version=version)
+    return dict(zoo.load_or_train(df_hist, version=version), state=zoo.initial_state(df_hist))
+
+@on_feature_version
+@metrics.track_cache('vintage_store', st.cache_resource(show_spinner=False, max_entries=2))
+def vintage_store(version):
+    # As-of fits of the model for every past month, indexed by date; only
+    # months after a data change are refitted (see nowcast/vintages.py)
+    _, df_hist = load_and_train(version=version)
+    return vintages.index(vintages.load_or_build(df_hist))
+
+@on_feature_version
+@metrics.track_cache('forecast_context', st.cache_resource(show_spinner=False, max_entries=2))
+def forecast_context(version):
+    model, df_hist = load_and_train(version=version)
+    return pipeline.context_from_model(model, df_hist, food_prices())
+
+@metrics.track_cache('food_prices', st.cache_resource(show_spinner=False))
+def food_prices():
+    return data.load_food_prices()
+
+@metrics.track_cache('contributions', st.cache_resource(show_spinner=False))
+def contributions():
+    return data.load_contributions()
+
+@st.cache_resource(show_spinner=False)
+def forecast_store():
+    return ForecastStore()
+
+# Historical Explorer
+@on_feature_version
+@metrics.track_cache('load_inflation', st.cache_resource(show_spinner=False, max_entries=2))
+def inflation(version):
+    return data.load_inflation(version)
+
+@on_feature_version
+@metrics.track_cache('inflation_aggregates', st.cache_resource(show_spinner=False, max_entries=2))
+def inflation_aggregates(version):
+    # Min/max (annotation offsets) and other aggregates, per version
+    return _aggregates('inflation', inflation(version=version))
+
+@metrics.track_cache('load_sub_imp_nir', st.cache_resource(show_spinner=False))
+def sub_imp_nir():
+    return data.load_sub_imp_nir()
+
+@metrics.track_cache('load_commodity_data', st.cache_resource(show_spinner=False, max_entries=2))
+def _commodity_snapshot(store_version):
+    return commodities.latest()
+
+def commodity_snapshot():
+    # Latest prices from the local bar store, re-read whenever the background
+    # refresh (see nowcast/commodities.py) has written new bars
+    return _commodity_snapshot(commodities.store_version())
+
+@metrics.track_cache('flag_grid', st.cache_resource(show_spinner=False))
+def flag_grid():
+    # Landing-page flags, resized and encoded once per process
+    return flags.grid_html()
+
+@st.cache_resource(show_spinner=False)
+def series_catalog():
+    # Every series the custom explorer view can plot (schemas only)
+    return catalog.catalog()
+
+@st.cache_resource(show_spinner=False)
+def _frame_version(name, version):
+    loaders = {'inflation': lambda: inflation(version=version), 'sub_imp_nir': sub_imp_nir,
+               'contributions': contributions, 'food_prices': food_prices}
+    df = loaders[name]()
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()[:12]
+
+def data_version(name):
+    # Content hash of one of the cached frames above, for figure-spec keys
+    return _frame_version(name, feature_version() if name == 'inflation' else None)
+
+# ------------------------------------------------------------------------------
+# Built figure specs, shared across pages, sessions and reruns
+# ------------------------------------------------------------------------------
+FIGURE_CACHE_MB = float(os.environ.get('NOWCAST_FIGURE_CACHE_MB', 64))
+
+@st.cache_resource(show_spinner=False)
+def figure_cache():
+    return SpecCache(max_bytes=int(FIGURE_CACHE_MB * 2**20), name='figure_specs')
+
+def figure_spec(kind, version, inputs, build):
+    # Serialized spec (JSON, or HTML for the ticker); build() -> str only runs
+    # on a miss. Pages hand the spec straight to the frontend.
+    return figure_cache().get_or_build(spec_key(kind, version, inputs), build)
+
+def explorer_spec(chart_choice, annotate=False):
+    # ECharts timeline options for the explorer, with or without annotations
+    inflation_view = chart_choice == charts.INFLATION
+    fv = feature_version()
+    df = inflation(version=fv) if inflation_view else sub_imp_nir()
+    def build():
+        opts = charts.echarts_options(df, chart_choice)
+        if inflation_view and annotate:
+            charts.add_inflation_annotations(opts, df, inflation_aggregates(version=fv))
+        return json.dumps(opts)
+    version = _frame_version('inflation', fv) if inflation_view else data_version('sub_imp_nir')
+    return figure_spec('echarts', version, (chart_choice, inflation_view and annotate), build)
+
+def custom_explorer_spec(series_ids, axes, kinds):
+    # Any catalog selection; on a miss only the picked columns are read
+    series_ids = list(series_ids)
+    def build():
+        df = catalog.load(series_ids)
+        by_col = dict(zip(series_ids, df.columns))
+        return json.dumps(charts.custom_echarts_options(
+            df, {by_col[s]: axes[s] for s in series_ids}, {by_col[s]: kinds[s] for s in series_ids}))
+    inputs = [(s, axes[s], kinds[s]) for s in series_ids]
+    return figure_spec('echarts_custom', catalog.versions(series_ids), inputs, build)
+
+def ticker_spec():
+    snapshot = commodity_snapshot()
+    version = hashlib.sha1(json.dumps(snapshot, sort_keys=True).encode()).hexdigest()[:12]
+    return figure_spec('ticker_html', version, (), lambda: charts.ticker_html(snapshot))
+
+# ------------------------------------------------------------------------------
+# Access: forecast pages need the landing-page login and Egypt selected
+# ------------------------------------------------------------------------------
+def require_access():
+    if not st.session_state.get('authenticated'):
+        st.info("Log in on the Data Exploration page first.")
+        stop()
+    if st.session_state.get('country') != "Egypt":
+        st.info("Forecasting is only available for Egypt.")
+        stop()
+
+# ------------------------------------------------------------------------------
+# Scenarios
+# ------------------------------------------------------------------------------
+def query_float(name, default=0.0):
+    try:
+        return float(st.query_params.get(name, default))
+    except ValueError:
+        return default
+
+def compute_forecast(exrg, gi):
+    # Returns (scenario key, store entry); computes only on a store miss
+    ctx = forecast_context()
+    store = forecast_store()
+    key = scenario_key(exrg, gi, ctx['n_periods'], context_version(ctx))
+    entry = store.get(key)
+    if entry is None:
+        res = pipeline.evaluate(ctx, [exrg], [gi])
+        df_fc = pd.DataFrame({'Year': ctx['dates'], 'Inflation': res['inflation'][0]})
+        entry = store.put(key, df_fc, exrg, gi)
+    return key, entry
+
+def zoo_forecast(exrg, gi):
+    # Per-model paths (n_models, n_periods) and the ensemble path, one pass
+    z = model_zoo()
+    paths = zoo.forecast(z, z['state'], [exrg], [gi])[:, 0, :]
+    return paths, zoo.ensemble(z, paths)
+
+def vintage_forecast(as_of, exrg, gi):
+    # (vintage, df_fc): the nowcast as the model stood at the end of as_of
+    vintage = vintages.as_of(vintage_store(), as_of)
+    return vintage, vintages.forecast(vintage, exrg, gi)
+
+def long_horizon_forecast(exrg, gi, months):
+    # Months 1..months ahead with the inputs held flat, in closed form
+    # (see nowcast/statespace.py)
+    ctx = forecast_context()
+    path = statespace.forecast_at(ctx['coefs'], ctx['state'], [exrg], [gi], list(range(1, months + 1)))[0]
+    start = ctx['dates'][0]
+    return pd.DataFrame({'Year': [start + pd.DateOffset(months=i) for i in range(months)], 'Inflation': path})
+
+@st.cache_resource(show_spinner=False)
+def export_cache():
+    return ResultCache(maxsize=32, name='export_workbooks')
+
+def scenario_workbook(key, exrg, gi):
+    # Every output of one scenario as a multi-sheet .xlsx (see nowcast/export.py)
+    cache = export_cache()
+    payload = cache.get(key)
+    if payload is None:
+        ctx = export.export_context(forecast_context(), food_prices())
+        chunk = pd.DataFrame({'scenario_id': [key], 'Exchange Rate Growth': [exrg], 'Global Inflation': [gi]})
+        buf = io.BytesIO()
+        export.write(ctx, [chunk], export.ExcelWriter(buf), contributions=contributions())
+        payload = buf.getvalue()
+        cache.put(key, payload)
+    return payload
+
+def publish_scenario(key, exrg, gi):
+    # Make the current page's URL a deep link to this forecast
+    st.session_state['scenario'] = key
+    st.query_params['scenario'] = key
+    if np.ndim(exrg) or np.ndim(gi):
+        # Monthly paths (POSTed to nowcast/service.py) only link by hash
+        st.query_params.pop('exrg', None)
+        st.query_params.pop('gi', None)
+    else:
+        st.query_params['exrg'] = str(exrg)
+        st.query_params['gi'] = str(gi)
+
+def current_forecast():
+    # URL first, then this session's last run, then the baseline (0% / 0%).
+    # Returns (df_fc, exrg, gi, is_baseline).
+    store = forecast_store()
+    for key in (st.query_params.get('scenario'), st.session_state.get('scenario')):
+        entry = store.get(key)
+        if entry is not None:
+            # Same inputs on the current model: a store hit unless the feature
+            # store changed since the link was made
+            key, entry = compute_forecast(entry['exrg'], entry['gi'])
+            publish_scenario(key, entry['exrg'], entry['gi'])
+            return entry['df_fc'], entry['exrg'], entry['gi'], False
+    is_baseline = 'exrg' not in st.query_params and 'gi' not in st.query_params
+    exrg, gi = query_float('exrg'), query_float('gi')
+    key, entry = compute_forecast(exrg, gi)
+    publish_scenario(key, exrg, gi)
+    return entry['df_fc'], exrg, gi, is_baseline
+
+# ------------------------------------------------------------------------------
+# Rerun instrumentation (see nowcast/metrics.py and nowcast/profiling.py)
+# ------------------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def metrics_exporter():
+    return metrics.start_exporter()
+
+@st.cache_resource(show_spinner=False)
+def background_warmup():
+    # Covers plain `streamlit run`; `python -m nowcast.serve` warms before
+    # the first session (see nowcast/warmup.py)
+    from nowcast import warmup
+    return warmup.start()
+
+def begin_rerun(page):
+    metrics_exporter()
+    background_warmup()
+    st.session_state['_rerun'] = (page, time.perf_counter())
+    profiling.start(page)
+
+def end_rerun():
+    # Call at the end of the page, or stop early with stop(); a rerun cut
+    # short by an exception is not timed (its ?profile=1 profile is saved at
+    # the start of the next rerun)
+    profiling.finish()
+    page, start = st.session_state.pop('_rerun', (None, None))
+    if page is not None:
+        metrics.REGISTRY.observe('rerun', page, time.perf_counter() - start)
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        metrics.REGISTRY.set_session_memory(ctx.session_id, int(session_memory_report()['bytes'].sum()))
+    if Runtime.exists():
+        # Sessions the server has closed stop being reported
+        metrics.REGISTRY.sweep_sessions(Runtime.instance().is_active_session)
+
+def stop():
+    # st.stop() for pages that called begin_rerun: the rerun is still timed,
+    # so early exits (landing page, access checks) count in the rerun p95
+    end_rerun()
+    st.stop()
+
+def session_memory_report():
+    # Per-key size of this session's session_state; frames and models are
+    # shared through the caches and the forecast store, not held here
+    rows = [{'key': k, 'type': type(v).__name__, 'bytes': metrics.object_nbytes(v)}
+            for k, v in st.session_state.to_dict().items()]
+    return pd.DataFrame(rows, columns=['key', 'type', 'bytes']).sort_values('bytes', ascending=False)
@@ -0,0 +1,151 @@
+# nowcast/batch.py
+#
+# Headless scenario runner for the nightly job: reads a scenario file, runs the
+# nowcast -> food bill -> NIR -> subsidy pipeline without Streamlit and streams
+# the results to CSV or Parquet chunk by chunk.
+#
+#   python -m nowcast.batch scenarios.csv --out results --format parquet --workers 8
+#
+# The scenario file has one row per scenario: a 'scenario_id' column plus either
+# flat inputs ('Exchange Rate Growth', 'Global Inflation', held for 12 months as
+# on the Nowcasting page) or monthly paths ('Exchange Rate Growth M1' ...
+# 'Exchange Rate Growth M12', 'Global Inflation M1' ... 'Global Inflation M12').
+
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from nowcast import pipeline
+
+INPUTS = ['Exchange Rate Growth', 'Global Inflation']
+
+# ------------------------------------------------------------------------------
+# Scenario chunks -> result frames
+# ------------------------------------------------------------------------------
+def _scenario_inputs(chunk, name, n_periods):
+    if name in chunk.columns:
+        return chunk[name].to_numpy(dtype=float)
+    cols = [f'{name} M{i + 1}' for i in range(n_periods)]
+    missing = [c for c in cols if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Scenario file needs '{name}' or monthly columns, missing {missing[:3]}")
+    return chunk[cols].to_numpy(dtype=float)
+
+def evaluate_scenarios(ctx, chunk):
+    n_periods = ctx['n_periods']
+    exrg = _scenario_inputs(chunk, INPUTS[0], n_periods)
+    gi = _scenario_inputs(chunk, INPUTS[1], n_periods)
+    res = pipeline.evaluate(ctx, exrg, gi)
+    ids = chunk['scenario_id'].to_numpy()
+
+    forecasts = pd.DataFrame({
+        'scenario_id': np.repeat(ids, n_periods),
+        'Year': np.tile(np.asarray(ctx['dates'], dtype='datetime64[ns]'), len(ids)),
+        'Inflation': res['inflation'].ravel(),
+    })
+    summary = pd.DataFrame({
+        'scenario_id': ids,
+        'Average Inflation': res['average_inflation'],
+        'Total Food Import Bill': res['total_food_bill'],
+        'NIR Cover (Months)': res['nir_cover'],
+        'Subsidy': res['subsidy'],
+    })
+    return forecasts, summary
+
+# ------------------------------------------------------------------------------
+# Worker processes get the context once, through the pool initializer
+# ------------------------------------------------------------------------------
+_worker_ctx = None
+_worker_evaluate = None
+
+def _init_worker(ctx, evaluate):
+    global _worker_ctx, _worker_evaluate
+    _worker_ctx, _worker_evaluate = ctx, evaluate
+
+def _run_chunk(chunk):
+    return _worker_evaluate(_worker_ctx, chunk)
+
+def run_chunks(ctx, chunks, workers=1, evaluate=evaluate_scenarios):
+    # Yields evaluate(ctx, chunk) per chunk ((forecasts, summary) by default),
+    # in input order. At most 2 * workers chunks are in flight, so memory
+    # stays bounded by chunk size. evaluate must be a module-level function.
+    if workers <= 1:
+        for chunk in chunks:
+            yield evaluate(ctx, chunk)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(ctx, evaluate)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_run_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# ------------------------------------------------------------------------------
+# Chunked readers / writers
+# ------------------------------------------------------------------------------
+def read_scenarios(path, chunk_size):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+class ChunkWriter:
+    def __init__(self, path, fmt):
+        self.path, self.fmt = path, fmt
+        self._writer = None
+        self._header = True
+
+    def write(self, df):
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self._header else 'a',
+                      header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def run(scenario_path, out_dir, fmt='csv', chunk_size=5000, workers=1):
+    os.makedirs(out_dir, exist_ok=True)
+    ctx = pipeline.load_context()
+    fc_writer = ChunkWriter(os.path.join(out_dir, f'forecasts.{fmt}'), fmt)
+    sum_writer = ChunkWriter(os.path.join(out_dir, f'summary.{fmt}'), fmt)
+    n = 0
+    try:
+        for forecasts, summary in run_chunks(ctx, read_scenarios(scenario_path, chunk_size), workers):
+            fc_writer.write(forecasts)
+            sum_writer.write(summary)
+            n += len(summary)
+    finally:
+        fc_writer.close()
+        sum_writer.close()
+    return n
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run nowcast scenarios without Streamlit.")
+    parser.add_argument('scenarios', help="CSV or Parquet scenario file")
+    parser.add_argument('--out', default='batch_output', help="output directory")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+    n = run(args.scenarios, args.out, args.format, args.chunk_size, args.workers)
+    print(f"{n} scenarios written to {args.out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# nowcast/cache.py
+#
+# Scenario hashing, a thread-safe LRU for evaluated scenario results, a
+# byte-bounded LRU for serialized figure specs and atomic file writes for the
+# on-disk caches. Every on-disk cache lives under CACHE_DIR (.cache, or
+# NOWCAST_CACHE_DIR, e.g. a throwaway directory for the benchmarks).
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from nowcast.metrics import REGISTRY
+
+CACHE_DIR = os.environ.get('NOWCAST_CACHE_DIR', '.cache')
+
+# ------------------------------------------------------------------------------
+# Atomic writes
+# ------------------------------------------------------------------------------
+def write_atomic(path, write, mode='w'):
+    # write(f) into a temp file unique to this writer, then rename it over
+    # path: readers never see a partial file and concurrent writers of the
+    # same path each replace it whole (the last one wins)
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+# ------------------------------------------------------------------------------
+# Scenario identity
+# ------------------------------------------------------------------------------
+def scenario_paths(exrg, gi, n_periods):
+    # Flat inputs and constant monthly paths give the same forecast, so both
+    # are normalised to monthly paths before hashing.
+    exrg = np.broadcast_to(np.asarray(exrg, dtype=float), (n_periods,))
+    gi = np.broadcast_to(np.asarray(gi, dtype=float), (n_periods,))
+    return exrg, gi
+
+def scenario_key(exrg, gi, n_periods, version=''):
+    exrg, gi = scenario_paths(exrg, gi, n_periods)
+    payload = json.dumps([version, np.round(exrg, 6).tolist(), np.round(gi, 6).tolist()])
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def context_version(ctx):
+    # Changes whenever the model, starting lags or food basket change
+    intercept, coef = ctx['coefs']
+    payload = json.dumps([round(intercept, 10), np.round(coef, 10).tolist(),
+                          list(ctx['state']), ctx['base_bill'],
+                          ctx['dates'][0].isoformat(), ctx['n_periods']])
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+# ------------------------------------------------------------------------------
+# LRU result cache
+# ------------------------------------------------------------------------------
+class ResultCache:
+    def __init__(self, maxsize=10000, name=None):
+        # Named caches also report their hit rate to the metrics registry
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                value = self._data[key]
+            else:
+                self.misses += 1
+                value = None
+        if self.name:
+            REGISTRY.cache_result(self.name, hit=value is not None)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+# ------------------------------------------------------------------------------
+# Byte-bounded LRU for built figure specs (JSON / HTML strings)
+# ------------------------------------------------------------------------------
+def spec_key(kind, version, inputs=()):
+    # (chart type, data version, inputs that change the figure)
+    payload = json.dumps([kind, version, list(inputs)], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+class SpecCache:
+    def __init__(self, max_bytes=64 * 2**20, name=None):
+        self.max_bytes = max_bytes
+        self.name = name
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            spec = self._data.get(key)
+            if spec is not None:
+                self._data.move_to_end(key)
+        if self.name:
+            REGISTRY.cache_result(self.name, hit=spec is not None)
+        return spec
+
+    def put(self, key, spec):
+        # Sized by length: specs are ASCII JSON / HTML, so characters ~ bytes
+        size = len(spec)
+        if size > self.max_bytes:
+            return spec
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._data[key] = spec
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= len(evicted)
+        return spec
+
+    def get_or_build(self, key, build):
+        # build() -> str runs only on a miss; concurrent misses may both build
+        spec = self.get(key)
+        return spec if spec is not None else self.put(key, build())
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,103 @@
+# nowcast/catalog.py
+#
+# Series catalog for the explorer's custom view. Every dated dataset in the
+# data layer is kept as a Parquet file (the feature store for the monthly
+# series, a columnar copy of each annual workbook and of the monthly
+# food-futures closes from the commodity bar store under .cache/columns), so
+# the catalog is read from the file schemas alone and load() only reads the
+# columns that were picked.
+#
+# Series ids are '<dataset>/<column>'; dates are month starts (annual data on
+# 1 January), in a 'Year' column like the rest of the app.
+
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from nowcast import commodities, data, features
+from nowcast.cache import CACHE_DIR, write_atomic
+from nowcast.metrics import timed
+
+COLUMN_DIR = os.path.join(CACHE_DIR, 'columns')
+
+COMMODITY_SOURCE = 'commodities'
+
+# name -> (label, frequency, source workbook, COMMODITY_SOURCE for the bar
+# store, or None for the feature store)
+DATASETS = {
+    'macro': ('Monthly macro series', 'monthly', None),
+    'sub_imp_nir': ('Subsidies, imports & reserves', 'annual', data.SUB_IMP_NIR_XLSX),
+    'contributions': ('Food price decomposition', 'annual', data.CONTRIBUTIONS_XLSX),
+    'futures': ('Food futures, monthly average close', 'monthly', COMMODITY_SOURCE),
+}
+
+# ------------------------------------------------------------------------------
+# Columnar files
+# ------------------------------------------------------------------------------
+def _workbook_parquet(name, workbook):
+    # Columnar copy of an annual workbook, rewritten when the workbook changes
+    path = os.path.join(COLUMN_DIR, f'{name}.parquet')
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(workbook):
+        df = pd.read_excel(workbook)
+        df['Year'] = pd.to_datetime(df['Year'].astype(str), format='%Y')
+        write_atomic(path, lambda f: df.sort_values('Year').to_parquet(f, index=False), 'wb')
+    return path
+
+def _commodity_parquet(name):
+    # Monthly closes from the bar store, rewritten when new bars were stored
+    path = os.path.join(COLUMN_DIR, f'{name}.parquet')
+    if not os.path.exists(path) or os.path.getmtime(path) < commodities.store_version():
+        df = commodities.monthly_closes()
+        write_atomic(path, lambda f: df.to_parquet(f, index=False), 'wb')
+    return path
+
+def dataset_file(name):
+    # (parquet path, version)
+    source = DATASETS[name][2]
+    if source is None:
+        meta = features.ensure()
+        return meta['path'], meta['version']
+    if source == COMMODITY_SOURCE:
+        path = _commodity_parquet(name)
+    else:
+        path = _workbook_parquet(name, source)
+    return path, hashlib.sha1(f'{path}:{os.path.getmtime(path)}'.encode()).hexdigest()[:12]
+
+# ------------------------------------------------------------------------------
+# Catalog and projected loads
+# ------------------------------------------------------------------------------
+@timed('series_catalog')
+def catalog():
+    # One row per series: id, column, dataset label, frequency (schema reads only)
+    rows = []
+    for name, (label, frequency, _) in DATASETS.items():
+        path, _ = dataset_file(name)
+        for col in pq.read_schema(path).names:
+            if col != 'Year':
+                rows.append({'id': f'{name}/{col}', 'series': col,
+                             'dataset': label, 'frequency': frequency})
+    return pd.DataFrame(rows, columns=['id', 'series', 'dataset', 'frequency'])
+
+def versions(series_ids):
+    return {name: dataset_file(name)[1] for name in sorted({s.split('/', 1)[0] for s in series_ids})}
+
+@timed('load_series')
+def load(series_ids):
+    # Year-indexed frame with one column per id, outer joined across datasets;
+    # only the requested columns are read. Columns are named by series, or by
+    # id where two datasets share a column name.
+    by_dataset = {}
+    for sid in series_ids:
+        name, col = sid.split('/', 1)
+        by_dataset.setdefault(name, []).append(col)
+    frames = []
+    for name, cols in by_dataset.items():
+        path, _ = dataset_file(name)
+        df = pd.read_parquet(path, columns=['Year', *cols]).set_index('Year')
+        frames.append(df.add_prefix(f'{name}/'))
+    df = pd.concat(frames, axis=1).sort_index()[list(series_ids)]
+    names = [sid.split('/', 1)[1] for sid in series_ids]
+    df.columns = [n if names.count(n) == 1 else sid for n, sid in zip(names, series_ids)]
+    return df
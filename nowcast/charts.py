@@ -0,0 +1,497 @@
+# nowcast/charts.py
+#
+# Chart builders for the explorer (ECharts options, ticker tape), the
+# Nowcasting and Impulse Responses pages (Altair) and the Decomposition /
+# Food Prices / Subsidies pages (Plotly). Pages only render what these return,
+# so builds can be timed and benchmarked on their own.
+
+import altair as alt
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from nowcast.metrics import timed
+
+INFLATION = 'Inflation'
+
+# ------------------------------------------------------------------------------
+# Explorer: ECharts timeline
+# ------------------------------------------------------------------------------
+def _timeline_options(df_plot, x_labels, series_config, y_axes):
+    # One timeline frame per label, each showing the series up to that point
+    # (frames may be float32; values are plotted at 2 decimals, gaps as null)
+    values = {col: [None if v != v else v
+                    for v in df_plot[col].to_numpy(dtype='float64').round(2).tolist()]
+              for col in df_plot.columns}
+    options = []
+    for i in range(len(x_labels)):
+        series = []
+        for col in df_plot.columns:
+            cfg = {'name': col, 'data': values[col][:i+1]}
+            cfg.update(series_config(col))
+            series.append(cfg)
+        options.append({'series': series})
+
+    return {
+        'baseOption': {
+            'timeline': {
+                'data': x_labels,
+                'axisType': 'category',
+                'autoPlay': False,
+                'playInterval': 900,
+                'currentIndex': len(x_labels)-1,
+                'left': '5%', 'right': '5%',
+                'label': {'show': False}, 'axisLabel': {'show': False}
+            },
+            'tooltip': {'trigger':'axis'},
+            'legend': {'data': list(df_plot.columns), 'left': 'center'},
+            'xAxis': {'type': 'category', 'data': x_labels},
+            'yAxis': y_axes,
+            'series': options[-1]['series']
+        },
+        'options': options
+    }
+
+@timed('echarts_options', 'chart')
+def echarts_options(df_plot, chart_choice):
+    if chart_choice == INFLATION:
+        x_labels = df_plot.index.strftime('%b %Y').tolist()
+    else:
+        x_labels = df_plot.index.year.astype(str).tolist()
+
+    def series_config(col):
+        if chart_choice != INFLATION and col == 'Reserves-to-Imports (Months)':
+            return {'type': 'bar', 'yAxisIndex': 1}
+        return {'type': 'line', 'smooth': True}
+
+    # Axis settings (only left gridlines)
+    if chart_choice == INFLATION:
+        y_axes = [{
+            'type': 'value',
+            'name': 'Inflation (%)',
+            'axisLabel': {'formatter': '{value}%'},
+            'splitLine': {'show': True}
+        }]
+    else:
+        y_axes = [
+            {'type': 'value', 'name': 'Subsidies & Imports ($)', 'axisLabel': {'formatter': '${value}'}, 'splitLine': {'show': True}},
+            {'type': 'value', 'name': 'Reserves-to-Imports (Months)', 'position': 'right', 'axisLabel': {'formatter': '{value}'}, 'splitLine': {'show': False}}
+        ]
+
+    return _timeline_options(df_plot, x_labels, series_config, y_axes)
+
+@timed('echarts_custom', 'chart')
+def custom_echarts_options(df_plot, axes, kinds=None):
+    # Any selection of catalog series (see nowcast/catalog.py). axes maps each
+    # column to 'Left' or 'Right', kinds (optional) to 'line' or 'bar'.
+    # Annual-only selections get year labels, anything monthly gets months.
+    annual = (df_plot.index.month == 1).all() and df_plot.index.year.is_unique
+    if annual:
+        x_labels = df_plot.index.year.astype(str).tolist()
+    else:
+        x_labels = df_plot.index.strftime('%b %Y').tolist()
+    kinds = kinds or {}
+
+    def series_config(col):
+        cfg = {'type': kinds.get(col, 'line'), 'yAxisIndex': int(axes.get(col) == 'Right'),
+               'connectNulls': True}
+        if cfg['type'] == 'line':
+            cfg['smooth'] = True
+        return cfg
+
+    # Axis names list their series (only left gridlines)
+    y_axes = []
+    for side in ('Left', 'Right'):
+        cols = [c for c in df_plot.columns if axes.get(c, 'Left') == side]
+        if side == 'Left' or cols:
+            y_axes.append({'type': 'value', 'name': ', '.join(cols), 'position': side.lower(),
+                           'splitLine': {'show': side == 'Left'}})
+    return _timeline_options(df_plot, x_labels, series_config, y_axes)
+
+@timed('echarts_annotations', 'chart')
+def add_inflation_annotations(chart_opts, df_plot, aggregates):
+    # Inject markPoint/markLine for the Inflation view (mutates chart_opts)
+    global_series = chart_opts['baseOption']['series'][0]
+    egypt_series  = chart_opts['baseOption']['series'][1]
+
+    # Offsets from the cached min/max of each series
+    g_min, g_max = aggregates.extent('Global Inflation')
+    offset_g = (g_max - g_min) * 0.4
+    e_min, e_max = aggregates.extent('Egypt Inflation')
+    offset_e = (e_max - e_min) * 0.4
+
+    # --- Global Inflation annotation for Jun 2011 (blue) ---
+    dt_g = pd.to_datetime('2011-06-01')
+    val_g = float(df_plot.at[dt_g, 'Global Inflation'])
+    global_series['markPoint'] = {
+        'data': [{
+            'name': 'Currency Devaluation',
+            'coord': ['Jun 2011', val_g + offset_g]
+        }],
+        'symbol': 'circle', 'symbolSize': 0,
+        'label': {
+            'show': True, 'formatter': '{b}', 'position': 'top',
+            'color': '#5470C6', 'fontSize': 12
+        }
+    }
+    global_series['markLine'] = {
+        'data': [[
+            {'coord': ['Jun 2011', val_g + offset_g]},
+            {'coord': ['Jun 2011', val_g]}
+        ]],
+        'symbol': ['none','none'],
+        'lineStyle': {'type':'dashed','color':'#5470C6','width':1},
+        'label': {'show': False}
+    }
+
+    # --- Egypt Inflation annotations for Oct 2016 & Jun 2022 (green) ---
+    annotations_e = [
+        ('Oct 2016', 'Prices Eased'),
+        ('Jun 2022', 'Currency Devaluation')
+    ]
+    mp_e, ml_e = [], []
+    for date_str, label in annotations_e:
+        dt = pd.to_datetime(date_str, format='%b %Y')
+        val = float(df_plot.at[dt, 'Egypt Inflation'])
+        mp_e.append({
+            'name': label,
+            'coord': [date_str, val + offset_e]
+        })
+        ml_e.append([
+            {'coord': [date_str, val + offset_e]},
+            {'coord': [date_str, val]}
+        ])
+
+    egypt_series['markPoint'] = {
+        'data': mp_e, 'symbol':'circle','symbolSize':0,
+        'label': {
+            'show': True, 'formatter':'{b}', 'position':'top',
+            'color':'#91CC75','fontSize':12
+        }
+    }
+    egypt_series['markLine'] = {
+        'data': ml_e,
+        'symbol': ['none','none'],
+        'lineStyle': {'type':'dashed','color':'#91CC75','width':1},
+        'label': {'show': False}
+    }
+    return chart_opts
+
+@timed('ticker_html', 'chart')
+def ticker_html(commodity_data):
+    items = []
+    for name, s in commodity_data.items():
+        price, chg = s['price'], s['change']
+        pr_s = f"{price:.2f}$" if price else "N/A"
+        ch_s = f"<span style='color:{'green' if chg>=0 else 'red'};'>{'+' if chg>=0 else ''}{chg:.2f}%</span>" if chg is not None else ""
+        items.append(f"<div class='ticker__item'>{name}: {pr_s} {ch_s}</div>")
+    return f"<div class='ticker-wrap'><div class='ticker'>{''.join(items)}</div></div>"
+
+# ------------------------------------------------------------------------------
+# Nowcasting page: Altair
+# ------------------------------------------------------------------------------
+@timed('altair_yearly', 'chart')
+def yearly_chart(hist_avg, df_fc):
+    # hist_avg: historical yearly averages [Year, Inflation], precomputed
+    # (see nowcast/aggregates.py); only the forecast is aggregated here.
+
+    # Forecast averages
+    fc_avg = (
+        df_fc.assign(Year=df_fc['Year'].dt.year)
+             .groupby('Year', as_index=False)['Inflation']
+             .mean()
+    )
+    fc_avg['Type'] = 'Forecast'
+
+    # Build a two-point segment so the forecast line connects to the last historical point
+    last_hist = hist_avg[hist_avg['Year'] == hist_avg['Year'].max()][['Year','Inflation']]
+    fc_segment = pd.concat([last_hist, fc_avg], ignore_index=True)
+
+    # Plot historical line
+    hist_line = alt.Chart(hist_avg).mark_line(strokeWidth=3).encode(
+        x=alt.X('Year:O', axis=alt.Axis(title='Year', labelAngle=0)),
+        y=alt.Y('Inflation:Q', axis=alt.Axis(title='Avg Inflation (%)')),
+        color=alt.value('steelblue')
+    )
+
+    # Plot forecast segment (dashed)
+    fc_line = alt.Chart(fc_segment).mark_line(strokeWidth=3, strokeDash=[4,4]).encode(
+        x='Year:O',
+        y='Inflation:Q',
+        color=alt.value('orange')
+    )
+
+    # Plot forecast points
+    fc_pts = alt.Chart(fc_avg).mark_point(size=100).encode(
+        x='Year:O',
+        y='Inflation:Q',
+        color=alt.value('orange')
+    )
+
+    return (hist_line + fc_line + fc_pts).properties(width=700, height=400)
+
+@timed('altair_monthly', 'chart')
+def monthly_chart(hist_monthly, df_fc):
+    # hist_monthly: months of the last historical year [Year, Inflation],
+    # precomputed (see nowcast/aggregates.py)
+
+    # Forecast monthly
+    fc_monthly = df_fc.copy()
+    fc_monthly['Type'] = 'Forecast'
+
+    # Build a two-point segment so the forecast line connects to the last historical month
+    last_month = hist_monthly.iloc[[-1]][['Year','Inflation']]
+    fc_segment_monthly = pd.concat(
+        [last_month, fc_monthly[['Year','Inflation']]],
+        ignore_index=True
+    )
+
+    # Plot historical line
+    hist_line_m = alt.Chart(hist_monthly).mark_line(strokeWidth=3).encode(
+        x=alt.X('yearmonth(Year):T', axis=alt.Axis(title='', format='%b %Y', labelAngle=0)),
+        y=alt.Y('Inflation:Q', axis=alt.Axis(title='Inflation Rate (%)')),
+        color=alt.value('steelblue')
+    )
+
+    # Plot forecast segment (dashed)
+    fc_line_m = alt.Chart(fc_segment_monthly).mark_line(strokeWidth=3, strokeDash=[4,4]).encode(
+        x=alt.X('yearmonth(Year):T'),
+        y='Inflation:Q',
+        color=alt.value('orange')
+    )
+
+    # Plot forecast points
+    fc_pts_m = alt.Chart(fc_monthly).mark_point(size=60).encode(
+        x=alt.X('yearmonth(Year):T'),
+        y='Inflation:Q',
+        color=alt.value('orange')
+    )
+
+    return (hist_line_m + fc_line_m + fc_pts_m).properties(width=700, height=350)
+
+@timed('altair_zoo', 'chart')
+def zoo_chart(df_paths):
+    # df_paths: [Year, Model, Inflation], one path per zoo model plus 'Ensemble'
+    # (see nowcast/zoo.py); the ensemble is drawn on top, thicker
+    models = alt.Chart(df_paths[df_paths['Model'] != 'Ensemble']).mark_line(strokeWidth=1.5, opacity=0.7).encode(
+        x=alt.X('yearmonth(Year):T', axis=alt.Axis(title='', format='%b %Y', labelAngle=0)),
+        y=alt.Y('Inflation:Q', axis=alt.Axis(title='Inflation Rate (%)')),
+        color=alt.Color('Model:N', legend=alt.Legend(orient='bottom', columns=3))
+    )
+    ensemble = alt.Chart(df_paths[df_paths['Model'] == 'Ensemble']).mark_line(strokeWidth=4).encode(
+        x=alt.X('yearmonth(Year):T'),
+        y='Inflation:Q',
+        color=alt.value('orange')
+    )
+    return (models + ensemble).properties(width=700, height=350)
+
+@timed('altair_vintage', 'chart')
+def vintage_chart(df_actual, df_fc, as_of):
+    # df_actual: realised inflation around the as-of month [Year, Inflation];
+    # df_fc: the forecast that vintage made
+    actual = alt.Chart(df_actual).mark_line(strokeWidth=3).encode(
+        x=alt.X('yearmonth(Year):T', axis=alt.Axis(title='', format='%b %Y', labelAngle=0)),
+        y=alt.Y('Inflation:Q', axis=alt.Axis(title='Inflation Rate (%)')),
+        color=alt.value('steelblue')
+    )
+    fc_line = alt.Chart(df_fc).mark_line(strokeWidth=3, strokeDash=[4,4]).encode(
+        x=alt.X('yearmonth(Year):T'),
+        y='Inflation:Q',
+        color=alt.value('orange')
+    )
+    cutoff = alt.Chart(pd.DataFrame({'Year': [as_of]})).mark_rule(color='gray').encode(
+        x=alt.X('yearmonth(Year):T'))
+    return (actual + fc_line + cutoff).properties(width=700, height=350)
+
+# ------------------------------------------------------------------------------
+# Impulse Responses page: Altair (see nowcast/statespace.py)
+# ------------------------------------------------------------------------------
+@timed('altair_impulse', 'chart')
+def impulse_chart(df_irf):
+    # df_irf: [Month, Shock, Response], months after a one-point shock
+    zero = alt.Chart(pd.DataFrame({'Response': [0.0]})).mark_rule(color='lightgray').encode(y='Response:Q')
+    lines = alt.Chart(df_irf).mark_line(strokeWidth=3).encode(
+        x=alt.X('Month:Q', axis=alt.Axis(title='Months after the shock')),
+        y=alt.Y('Response:Q', axis=alt.Axis(title='Inflation response (pp)')),
+        color=alt.Color('Shock:N', scale=alt.Scale(range=['steelblue', 'orange']),
+                        legend=alt.Legend(orient='bottom', title=None))
+    )
+    return (zero + lines).properties(width=700, height=350)
+
+@timed('altair_long_horizon', 'chart')
+def long_horizon_chart(df_path, steady=None):
+    # df_path: [Year, Inflation] months ahead; steady: long-run level or None
+    line = alt.Chart(df_path).mark_line(strokeWidth=3, color='orange').encode(
+        x=alt.X('yearmonth(Year):T', axis=alt.Axis(title='', format='%b %Y', labelAngle=0)),
+        y=alt.Y('Inflation:Q', axis=alt.Axis(title='Inflation Rate (%)'))
+    )
+    if steady is None:
+        return line.properties(width=700, height=350)
+    rule = alt.Chart(pd.DataFrame({'Inflation': [steady]})).mark_rule(
+        strokeDash=[4, 4], color='steelblue').encode(y='Inflation:Q')
+    return (line + rule).properties(width=700, height=350)
+
+# ------------------------------------------------------------------------------
+# Decomposition page: stacked horizontal bar (Plotly)
+# ------------------------------------------------------------------------------
+# Desired legend order
+DECOMPOSITION_ORDER = [
+    "World Food Price (increase)",
+    "World Food Price (decrease)",
+    "Exchange Rate (depreciation)",
+    "Exchange Rate (appreciation)",
+    "Other Factors",
+    "Unexplained (residuals)"
+]
+
+DECOMPOSITION_COLORS = {
+    "World Food Price (increase)": "#1F3B73",
+    "World Food Price (decrease)": "#8B0000",
+    "Exchange Rate (depreciation)": "#89CFF0",
+    "Exchange Rate (appreciation)": "#F08080",
+    "Other Factors": "#FFB347",
+    "Unexplained (residuals)": "#FF8C00"
+}
+
+@timed('plotly_decomposition', 'chart')
+def decomposition_figure(row):
+    year_label = str(int(row["Year"]))
+
+    # Extract values in legend order
+    cats = []
+    vals = []
+    for cat in DECOMPOSITION_ORDER:
+        if cat in row.index:
+            cats.append(cat)
+            vals.append(float(row[cat]))
+
+    # Split into negative and positive preserving order
+    neg_data = []
+    pos_data = []
+    for cat, val in zip(cats, vals):
+        if val < 0:
+            neg_data.append((cat, val))
+        else:
+            pos_data.append((cat, val))
+
+    fig = go.Figure()
+
+    for data in (neg_data, pos_data):
+        base = 0.0
+        for cat, val in data:
+            fig.add_trace(go.Bar(
+                y=[year_label],
+                x=[val],
+                name=cat,
+                orientation='h',
+                marker=dict(color=DECOMPOSITION_COLORS[cat]),
+                base=[base],
+                customdata=[val],
+                hovertemplate=f"<b>{cat}</b><br>Value: %{{customdata}}<extra></extra>"
+            ))
+            base += val
+
+    fig.update_layout(
+        title=dict(
+            text="Decomposition of Domestic Food Price Change in Egypt",
+            x=0.5, xanchor="center",
+            font=dict(size=16)
+        ),
+        barmode='relative',
+        template='plotly_white',
+        height=350,
+        margin=dict(l=40, r=40, t=60, b=80),
+        xaxis=dict(
+            title="",
+            showline=True,
+            linecolor="black",
+            linewidth=1,
+            zeroline=True,
+            zerolinewidth=2,
+            zerolinecolor="black",
+            showgrid=False,
+            tickmode='array',
+            tickvals=[-100, -80, -60, -40, -20, 0, 20, 40, 60, 80, 100, 120, 140, 160],
+            ticks="outside",
+            tickfont=dict(size=12)
+        ),
+        yaxis=dict(
+            title="",
+            tickmode='array',
+            tickvals=[year_label],
+            ticktext=[year_label],
+            ticks="",
+            showgrid=False,
+            showline=False
+        ),
+        legend=dict(
+            orientation="h",
+            y=-0.25,
+            x=0.5,
+            xanchor="center",
+            yanchor="top",
+            font=dict(size=12),
+            bgcolor="rgba(0,0,0,0)"
+        ),
+        showlegend=True
+    )
+    return fig
+
+# ------------------------------------------------------------------------------
+# Food Prices page: import bill by item (Plotly)
+# ------------------------------------------------------------------------------
+@timed('plotly_food_prices', 'chart')
+def food_prices_figure(adjusted_prices_for_year, year_display):
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        y=adjusted_prices_for_year['Food Name'],
+        x=adjusted_prices_for_year['Total Value'],
+        orientation='h',
+        marker=dict(color='#FF8C00'),
+        hovertemplate="<b>%{y}</b><br>Total Value:%{x:,.0f}<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=f"Import Bill adjusted for inflation by category: {year_display} -Forecasted",
+        xaxis=dict(title=""),
+        yaxis=dict(title=""),
+        showlegend=False,
+        template='plotly_white',
+        height=500
+    )
+    return fig
+
+# ------------------------------------------------------------------------------
+# Subsidies page: subsidy vs reference (Plotly Express)
+# ------------------------------------------------------------------------------
+@timed('plotly_subsidies', 'chart')
+def subsidy_figure(subsidy):
+    # Subsidy value and reference value of 140B, in billions
+    subsidy_data = pd.DataFrame({
+        "Category": ["Subsidy Value", "Reference Value (140B)"],
+        "Amount": [subsidy / 1e9, 140]
+    })
+
+    fig = px.bar(subsidy_data, x="Amount", y="Category",
+                 title="Subsidy Calculation Visualization",
+                 labels={"Amount": "Amount (in billions EGP)"},
+                 orientation='h',
+                 color="Category",
+                 color_discrete_map={"Subsidy Value": "#FF8C00",            # Orange for Subsidy
+                                     "Reference Value (140B)": "#D3D3D3"})  # Light grey for Reference
+
+    fig.update_layout(
+        xaxis_title="Amount (in billions EGP)",
+        yaxis_title="",
+        template='plotly_white',
+        height=400,
+        showlegend=False,
+        hoverlabel=dict(namelength=0)  # Removes the category name from the hover text
+    )
+
+    # Hover text in billions with a "B" suffix and two decimal places
+    fig.update_traces(
+        hovertemplate="Amount: %{x:,.2f}B EGP"
+    )
+    return fig
@@ -0,0 +1,208 @@
+# nowcast/commodities.py
+#
+# Local history of daily bars for the food futures on the explorer's ticker,
+# kept in SQLite so pages read prices from disk instead of calling Yahoo on
+# every start. update() appends only bars from the last stored day onwards
+# (that day is re-fetched, as its bar may have been partial). The warm-up
+# starts a background thread that updates right away and then every
+# REFRESH_INTERVAL seconds, so start-up makes no network calls and the ticker
+# stays current without an external cron job. Until the first bars arrive the
+# ticker shows N/A.
+#
+# history() / monthly_closes() serve the stored closes to the explorer's
+# custom view (see nowcast/catalog.py).
+#
+#   python -m nowcast.commodities                         # update from Yahoo
+#   python -m nowcast.commodities --source prices/        # offline, from CSVs
+#
+# A file source is a directory of '<symbol>.csv' files with Date, Open, High,
+# Low, Close, Volume columns. NOWCAST_COMMODITY_SOURCE / NOWCAST_COMMODITY_DB
+# override the source directory and database path; NOWCAST_COMMODITY_REFRESH
+# sets the refresh interval (0 turns the background refresh off).
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import pandas as pd
+import yfinance as yf
+
+from nowcast.cache import CACHE_DIR
+from nowcast.metrics import timed
+
+TICKERS = {
+    "Rice":"ZR=F","Wheat":"ZW=F","Maize":"ZC=F",
+    "Soybeans":"ZS=F","Soybean Oil":"ZL=F","Soybean Meal":"ZM=F",
+    "Sugar":"SB=F","Beef":"LE=F","Oranges":"OJ=F",
+    "Coffee":"KC=F","Cocoa":"CC=F"
+}
+DB_PATH = os.environ.get('NOWCAST_COMMODITY_DB', os.path.join(CACHE_DIR, 'commodities.sqlite'))
+FIRST_FETCH_PERIOD = '5y'
+REFRESH_INTERVAL = float(os.environ.get('NOWCAST_COMMODITY_REFRESH', 600))  # s
+BAR_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+# ------------------------------------------------------------------------------
+# Sources: bars(symbol, start) -> DataFrame[BAR_COLUMNS], date as 'YYYY-MM-DD'
+# ------------------------------------------------------------------------------
+def _normalize(df):
+    df = df.reset_index()
+    df.columns = [str(c).lower() for c in df.columns]
+    dates = pd.to_datetime(df['date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    df['date'] = dates.dt.strftime('%Y-%m-%d')
+    return df.reindex(columns=BAR_COLUMNS).dropna(subset=['close'])
+
+class YahooSource:
+    def bars(self, symbol, start=None):
+        ticker = yf.Ticker(symbol)
+        if start is None:
+            df = ticker.history(period=FIRST_FETCH_PERIOD, interval='1d', auto_adjust=False)
+        else:
+            df = ticker.history(start=start, interval='1d', auto_adjust=False)
+        return _normalize(df)
+
+class FileSource:
+    def __init__(self, root):
+        self.root = root
+
+    def bars(self, symbol, start=None):
+        path = os.path.join(self.root, f'{symbol}.csv')
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        df = _normalize(pd.read_csv(path).set_index('Date'))
+        return df if start is None else df[df['date'] >= start]
+
+def default_source():
+    root = os.environ.get('NOWCAST_COMMODITY_SOURCE')
+    return FileSource(root) if root else YahooSource()
+
+# ------------------------------------------------------------------------------
+# Store
+# ------------------------------------------------------------------------------
+def connect(path=DB_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bars (
+            symbol TEXT NOT NULL, date TEXT NOT NULL,
+            open REAL, high REAL, low REAL, close REAL NOT NULL, volume REAL,
+            PRIMARY KEY (symbol, date)
+        ) WITHOUT ROWID
+    """)
+    return conn
+
+def last_dates(conn):
+    return dict(conn.execute("SELECT symbol, MAX(date) FROM bars GROUP BY symbol"))
+
+@timed('update_commodities', 'fetch')
+def update(source=None, path=DB_PATH, symbols=None):
+    # Returns {symbol: bars written}; a symbol whose fetch fails is skipped
+    source = source or default_source()
+    written = {}
+    with closing(connect(path)) as conn:
+        last = last_dates(conn)
+        for symbol in symbols or TICKERS.values():
+            try:
+                df = source.bars(symbol, last.get(symbol))
+            except Exception:
+                written[symbol] = 0
+                continue
+            rows = [(symbol, *r) for r in df[BAR_COLUMNS].itertuples(index=False, name=None)]
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            written[symbol] = len(rows)
+    return written
+
+# ------------------------------------------------------------------------------
+# Background refresh (one thread per process)
+# ------------------------------------------------------------------------------
+_refresh_lock = threading.Lock()
+_refresh_thread = None
+
+def _refresh_loop(interval, path):
+    while True:
+        try:
+            update(path=path)
+        except Exception:
+            pass  # next round retries; update() already skips failing symbols
+        time.sleep(interval)
+
+def start_refresh(interval=REFRESH_INTERVAL, path=DB_PATH):
+    # Idempotent; the first update runs in the thread right away
+    global _refresh_thread
+    with _refresh_lock:
+        if _refresh_thread is None and interval > 0:
+            _refresh_thread = threading.Thread(target=_refresh_loop, args=(interval, path),
+                                               name='commodity-refresh', daemon=True)
+            _refresh_thread.start()
+    return _refresh_thread
+
+# ------------------------------------------------------------------------------
+# Read side (local disk only)
+# ------------------------------------------------------------------------------
+def store_version(path=DB_PATH):
+    # Changes whenever bars are written (0 before the store exists)
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+@timed('commodity_latest')
+def latest(path=DB_PATH):
+    # {name: {'price', 'change'}} from the last two closes, as the ticker
+    # expects; None for commodities without bars yet (shown as N/A)
+    with closing(connect(path)) as conn:
+        rows = conn.execute("""
+            SELECT symbol, close FROM (
+                SELECT symbol, close,
+                       ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC) AS n
+                FROM bars
+            ) WHERE n <= 2 ORDER BY symbol, n
+        """).fetchall()
+    closes = {}
+    for symbol, close in rows:
+        closes.setdefault(symbol, []).append(close)
+    out = {}
+    for name, symbol in TICKERS.items():
+        price, prev = (closes.get(symbol, []) + [None, None])[:2]
+        pct = (price - prev)/prev*100 if price and prev else None
+        out[name] = {"price": price, "change": pct}
+    return out
+
+@timed('commodity_history')
+def history(start=None, path=DB_PATH):
+    # Daily closes, one column per commodity name (for charts and features)
+    query = "SELECT symbol, date, close FROM bars" + (" WHERE date >= ?" if start else "")
+    with closing(connect(path)) as conn:
+        df = pd.read_sql_query(query, conn, params=[start] if start else None)
+    wide = df.pivot(index='date', columns='symbol', values='close')
+    wide.index = pd.to_datetime(wide.index)
+    names = {symbol: name for name, symbol in TICKERS.items()}
+    return wide.rename(columns=names).reindex(columns=list(TICKERS))
+
+def monthly_closes(path=DB_PATH):
+    # Average close per calendar month, dated on the first like the other
+    # monthly series ('Year' column)
+    daily = history(path=path)
+    monthly = daily.groupby(daily.index.to_period('M')).mean()
+    monthly.index = monthly.index.to_timestamp()
+    monthly.index.name = 'Year'
+    return monthly.reset_index()
+
+# ------------------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append new daily commodity bars to the local store.")
+    parser.add_argument('--source', help="directory of '<symbol>.csv' files instead of Yahoo")
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    source = FileSource(args.source) if args.source else None
+    written = update(source, args.db)
+    for symbol, n in written.items():
+        print(f"{symbol:<6} {n:>6} bars")
+
+if __name__ == '__main__':
+    main()
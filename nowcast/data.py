@@ -0,0 +1,84 @@
+# nowcast/data.py
+#
+# Workbook loaders shared by the Streamlit pages and the headless tools.
+# Paths are relative to the repository root, like the pages themselves.
+
+import numpy as np
+import pandas as pd
+
+from nowcast import features
+from nowcast.metrics import timed
+
+FOOD_PRICES_XLSX = 'FoodPricesTest.xlsx'
+CONTRIBUTIONS_XLSX = 'StackedBar - Copy.xlsx'
+SUB_IMP_NIR_XLSX = 'Plots - Subsidies - Imports - NIR.xlsx'
+
+# ------------------------------------------------------------------------------
+# Compact dtypes for frames that sit in the shared caches
+# ------------------------------------------------------------------------------
+def compact(df, decimals=None):
+    # float64 -> float32 where the round trip is lossless (to `decimals` places
+    # when given), low-cardinality text -> category. Modifies df in place.
+    for col in df.columns:
+        s = df[col]
+        if s.dtype == np.float64:
+            s32 = s.astype(np.float32)
+            back, ref = s32.astype(np.float64), s
+            if decimals is not None:
+                back, ref = back.round(decimals), ref.round(decimals)
+            if ((back == ref) | s.isna()).all():
+                df[col] = s32
+        elif s.dtype == object and s.nunique() < 0.5 * len(s):
+            df[col] = s.astype('category')
+    return df
+
+# ------------------------------------------------------------------------------
+# Training data for the inflation model
+# ------------------------------------------------------------------------------
+@timed('load_training_frame')
+def load_training_frame(version=None):
+    # Raw series + derived lags from the feature store (see nowcast/features.py),
+    # without the first months whose lags are not available yet
+    return features.load_features(version=version).dropna(subset=features.LAG_COLUMNS + features.RAW_SERIES)
+
+# ------------------------------------------------------------------------------
+# Food import basket (Food Name, Category, Price, Quantity)
+# ------------------------------------------------------------------------------
+@timed('load_food_prices')
+def load_food_prices(path=FOOD_PRICES_XLSX):
+    return compact(pd.read_excel(path))
+
+# ------------------------------------------------------------------------------
+# Historical decomposition of food price changes
+# ------------------------------------------------------------------------------
+@timed('load_contributions')
+def load_contributions(path=CONTRIBUTIONS_XLSX):
+    return compact(pd.read_excel(path))
+
+# ------------------------------------------------------------------------------
+# Historical Explorer series
+# ------------------------------------------------------------------------------
+@timed('load_inflation')
+def load_inflation(version=None):
+    # The explorer's Global Inflation line is its own series, not the model's
+    # (see nowcast/features.py)
+    df = (features.load_features(['Year', 'Global Inflation (Explorer)', 'Egypt Inflation'], version=version)
+                  .rename(columns={'Global Inflation (Explorer)': 'Global Inflation'}))
+    return (
+        df.dropna(subset=['Global Inflation','Egypt Inflation'])
+          .set_index('Year')
+          .round(2)
+          .pipe(compact, decimals=2)
+    )
+
+@timed('load_sub_imp_nir')
+def load_sub_imp_nir(path=SUB_IMP_NIR_XLSX):
+    df = pd.read_excel(path)
+    df['Year'] = pd.to_datetime(df['Year'], format='%Y')
+    return (
+        df.sort_values('Year')
+          .dropna(subset=['Subsidies','Food Imports','Reserves-to-Imports (Months)'])
+          .set_index('Year')[['Subsidies','Food Imports','Reserves-to-Imports (Months)']]
+          .round(2)
+          .pipe(compact, decimals=2)
+    )
@@ -0,0 +1,162 @@
+# nowcast/export.py
+#
+# Bulk export of every computed output for one or many scenarios:
+#
+#   forecast          scenario_id, Year, Inflation
+#   summary           average inflation, food bill, NIR cover, subsidy
+#   subsidy_path      subsidy implied by the average inflation to each month
+#   food_prices       per-item adjusted prices and values
+#   category_totals   adjusted food bill per category
+#   contributions     historical decomposition (scenario independent)
+#
+#   python -m nowcast.export scenarios.csv --out export --format xlsx --workers 8
+#
+# Scenario files are read as for nowcast.batch. Scenarios are evaluated
+# chunk by chunk and every table is appended as it is produced: one file per
+# table for CSV / Parquet, one sheet per table of a single workbook for Excel
+# (openpyxl write-only mode streams rows to disk), so the full result never
+# sits in memory.
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from nowcast import batch, data, food_bill, pipeline
+
+TABLES = ['forecast', 'summary', 'subsidy_path', 'food_prices', 'category_totals']
+EXCEL_MAX_ROWS = 1048575  # per sheet, after the header
+
+# ------------------------------------------------------------------------------
+# Scenario chunk -> every output table
+# ------------------------------------------------------------------------------
+def export_context(ctx=None, food_prices_df=None):
+    # The pipeline context plus the food basket (plain arrays, cheap to pickle)
+    ctx = dict(ctx or pipeline.load_context())
+    basket = data.load_food_prices() if food_prices_df is None else food_prices_df
+    ctx['basket'] = {
+        'Food Name': basket['Food Name'].astype(str).to_numpy(),
+        'Category': basket['Category'].astype(str).to_numpy(),
+        'Price': basket['Price'].to_numpy(dtype=np.float64),
+        'Quantity': basket['Quantity'].to_numpy(dtype=np.float64),
+    }
+    return ctx
+
+def evaluate_tables(ctx, chunk):
+    forecast, summary = batch.evaluate_scenarios(ctx, chunk)
+    ids = summary['scenario_id'].to_numpy()
+    n, n_periods = len(ids), ctx['n_periods']
+
+    # Subsidy on the running average inflation, month by month
+    paths = forecast['Inflation'].to_numpy().reshape(n, n_periods)
+    running = np.cumsum(paths, axis=1) / np.arange(1, n_periods + 1)
+    subsidy_path = pd.DataFrame({
+        'scenario_id': forecast['scenario_id'],
+        'Year': forecast['Year'],
+        'Average Inflation to Date': running.ravel(),
+        'Subsidy': food_bill.subsidy_value(running).ravel(),
+    })
+
+    # Basket repriced for every scenario at once: (scenarios, items)
+    basket = ctx['basket']
+    n_items = len(basket['Price'])
+    adjusted = (1 + summary['Average Inflation'].to_numpy() / 100)[:, None] * basket['Price']
+    food_prices = pd.DataFrame({
+        'scenario_id': np.repeat(ids, n_items),
+        'Food Name': np.tile(basket['Food Name'], n),
+        'Category': np.tile(basket['Category'], n),
+        'Price': np.tile(basket['Price'], n),
+        'Quantity': np.tile(basket['Quantity'], n),
+        'Adjusted Price': adjusted.ravel(),
+        'Total Value': (adjusted * basket['Quantity']).ravel(),
+    })
+    category_totals = (food_prices.groupby(['scenario_id', 'Category'], sort=False, as_index=False)
+                                  ['Total Value'].sum())
+    return {'forecast': forecast, 'summary': summary, 'subsidy_path': subsidy_path,
+            'food_prices': food_prices, 'category_totals': category_totals}
+
+# ------------------------------------------------------------------------------
+# Writers: write(table, df) per chunk, close() at the end
+# ------------------------------------------------------------------------------
+class DirectoryWriter:
+    # One CSV / Parquet file per table (see batch.ChunkWriter)
+    def __init__(self, out_dir, fmt):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir, self.fmt = out_dir, fmt
+        self._writers = {}
+
+    def write(self, table, df):
+        if table not in self._writers:
+            path = os.path.join(self.out_dir, f'{table}.{self.fmt}')
+            self._writers[table] = batch.ChunkWriter(path, self.fmt)
+        self._writers[table].write(df)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+
+class ExcelWriter:
+    # One sheet per table in a write-only workbook; a table longer than a
+    # sheet continues on '<table> (2)', '<table> (3)', ...
+    def __init__(self, target):
+        from openpyxl import Workbook
+        self.target = target
+        self.wb = Workbook(write_only=True)
+        self._sheets = {}  # table -> [worksheet, rows, sheet count]
+
+    def write(self, table, df):
+        header = [str(c) for c in df.columns]
+        state = self._sheets.get(table)
+        for row in df.itertuples(index=False, name=None):
+            if state is None or state[1] >= EXCEL_MAX_ROWS:
+                count = 1 if state is None else state[2] + 1
+                ws = self.wb.create_sheet(table if count == 1 else f'{table} ({count})')
+                ws.append(header)
+                state = self._sheets[table] = [ws, 0, count]
+            state[0].append(row)
+            state[1] += 1
+
+    def close(self):
+        if isinstance(self.target, str):
+            os.makedirs(os.path.dirname(self.target) or '.', exist_ok=True)
+        self.wb.save(self.target)
+
+def open_writer(out, fmt):
+    if fmt == 'xlsx':
+        return ExcelWriter(out if out.endswith('.xlsx') else os.path.join(out, 'export.xlsx'))
+    return DirectoryWriter(out, fmt)
+
+# ------------------------------------------------------------------------------
+# Export
+# ------------------------------------------------------------------------------
+def write(ctx, chunks, writer, contributions=None, workers=1):
+    # Streams every table of every chunk into writer; returns the scenario count
+    n = 0
+    try:
+        writer.write('contributions', data.load_contributions() if contributions is None else contributions)
+        for tables in batch.run_chunks(ctx, chunks, workers, evaluate=evaluate_tables):
+            for table in TABLES:
+                writer.write(table, tables[table])
+            n += len(tables['summary'])
+    finally:
+        writer.close()
+    return n
+
+def run(scenario_path, out, fmt='csv', chunk_size=5000, workers=1):
+    return write(export_context(), batch.read_scenarios(scenario_path, chunk_size),
+                 open_writer(out, fmt), workers=workers)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export every output for a batch of scenarios.")
+    parser.add_argument('scenarios', help="CSV or Parquet scenario file (as for nowcast.batch)")
+    parser.add_argument('--out', default='export_output', help="output directory (or .xlsx path)")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'xlsx'], default='csv')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+    n = run(args.scenarios, args.out, args.format, args.chunk_size, args.workers)
+    print(f"{n} scenarios exported to {args.out}")
+
+if __name__ == '__main__':
+    main()
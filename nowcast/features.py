@@ -0,0 +1,174 @@
+# nowcast/features.py
+#
+# Ingestion: raw monthly series -> validated, lagged feature store. The raw
+# file holds one row per month with the observed series only (Year, Egypt
+# Inflation, Exchange Rate Growth, Global Inflation, plus the explorer's
+# Global Inflation line); every lag column is derived here with vectorized
+# shifts, so a new month needs one raw row.
+#
+#   python -m nowcast.features                      # (re)build the store
+#   python -m nowcast.features --append 2025-01-01 24.0 55.1 6.3 6.9
+#
+# The raw CSV is the single source for these series. It was assembled from
+# the former training workbook (model series) and the former Visuals
+# workbook, whose 'Global Inflation' is a different series from the model's;
+# it is kept as 'Global Inflation (Explorer)' and only plotted.
+#
+# The store is one Parquet file per version under .cache/features, named by a
+# hash of the raw data and the feature layout; CURRENT points at the latest.
+# Training, the explorer and the forecast pages all read from it (through
+# nowcast/data.py) and it is rebuilt when the raw file is newer.
+
+import argparse
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from nowcast.cache import CACHE_DIR, write_atomic
+from nowcast.metrics import timed
+
+RAW_PATH = 'Python Data New - Interface - Raw.csv'
+STORE_DIR = os.path.join(CACHE_DIR, 'features')
+RAW_SERIES = ['Egypt Inflation', 'Exchange Rate Growth', 'Global Inflation']  # model inputs, lagged
+EXPLORER_SERIES = ['Global Inflation (Explorer)']  # stored as is, not lagged
+RAW_COLUMNS = RAW_SERIES + EXPLORER_SERIES
+LAGS = (1, 2)
+LAYOUT_VERSION = 2  # bump when the derived columns change
+
+LAG_COLUMNS = [f'{name} Lag{k}' for name in RAW_SERIES for k in LAGS]
+
+# ------------------------------------------------------------------------------
+# Raw series: read and validate
+# ------------------------------------------------------------------------------
+def read_raw(path=RAW_PATH):
+    # CSV (the checked-in source) or a workbook with the same columns
+    if path.endswith('.csv'):
+        df = pd.read_csv(path, parse_dates=['Year'], float_precision='round_trip')
+    else:
+        df = pd.read_excel(path)
+    return validate(df, path)
+
+def validate(df, source='raw series'):
+    missing = [c for c in ['Year'] + RAW_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"{source}: missing columns {missing}")
+    df = df[['Year'] + RAW_COLUMNS].copy()
+    df['Year'] = pd.to_datetime(df['Year'])
+    for col in RAW_COLUMNS:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            raise ValueError(f"{source}: column '{col}' is not numeric")
+    df = df.sort_values('Year', ignore_index=True)
+
+    # One row per calendar month, first of the month, no gaps or repeats
+    dates = df['Year']
+    if not dates.dt.is_month_start.all():
+        bad = dates[~dates.dt.is_month_start].iloc[0]
+        raise ValueError(f"{source}: dates must be the first of the month, got {bad.date()}")
+    expected = pd.date_range(dates.iloc[0], periods=len(df), freq='MS')
+    mismatch = dates.to_numpy() != expected.to_numpy()
+    if mismatch.any():
+        i = mismatch.argmax()
+        raise ValueError(f"{source}: expected {expected[i].date()} after "
+                         f"{dates.iloc[i - 1].date()}, got {dates.iloc[i].date()}")
+    return df
+
+# ------------------------------------------------------------------------------
+# Derived features
+# ------------------------------------------------------------------------------
+def derive_features(raw):
+    # Lag columns for every raw series; the first max(LAGS) months keep NaN lags
+    lagged = pd.concat(
+        [raw[RAW_SERIES].shift(k).add_suffix(f' Lag{k}') for k in LAGS], axis=1
+    )[LAG_COLUMNS]
+    return pd.concat([raw, lagged], axis=1)
+
+def feature_version(raw):
+    h = hashlib.sha1(str(LAYOUT_VERSION).encode())
+    h.update(pd.util.hash_pandas_object(raw, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:12]
+
+# ------------------------------------------------------------------------------
+# Store
+# ------------------------------------------------------------------------------
+def _current_path(store_dir):
+    return os.path.join(store_dir, 'CURRENT')
+
+def current(store_dir=STORE_DIR):
+    path = _current_path(store_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+@timed('ingest_features')
+def ingest(raw_path=RAW_PATH, store_dir=STORE_DIR):
+    source_mtime = os.path.getmtime(raw_path)
+    raw = read_raw(raw_path)
+    version = feature_version(raw)
+    meta = {
+        'version': version,
+        'file': os.path.basename(version_path(version, store_dir)),
+        'source': raw_path,
+        'source_mtime': source_mtime,
+        'rows': len(raw),
+        'first': raw['Year'].iloc[0].date().isoformat(),
+        'last': raw['Year'].iloc[-1].date().isoformat(),
+    }
+    path = os.path.join(store_dir, meta['file'])
+    if not os.path.exists(path):
+        write_atomic(path, lambda f: derive_features(raw).to_parquet(f, index=False), 'wb')
+    write_atomic(_current_path(store_dir), lambda f: json.dump(meta, f))
+    return meta
+
+def ensure(raw_path=RAW_PATH, store_dir=STORE_DIR):
+    # Metadata of the current store, re-ingesting first if the raw file changed
+    meta = current(store_dir)
+    if meta is None or meta['source'] != raw_path or meta['source_mtime'] < os.path.getmtime(raw_path):
+        meta = ingest(raw_path, store_dir)
+    return dict(meta, path=os.path.join(store_dir, meta['file']))
+
+def version_path(version, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f'features-{version}.parquet')
+
+@timed('load_features')
+def load_features(columns=None, raw_path=RAW_PATH, store_dir=STORE_DIR, version=None):
+    # Columns are projected at read time. version: read that stored version
+    # (the files are kept) instead of the current one
+    path = version_path(version, store_dir) if version else ensure(raw_path, store_dir)['path']
+    return pd.read_parquet(path, columns=columns)
+
+def append_raw(rows, raw_path=RAW_PATH, store_dir=STORE_DIR):
+    # rows: DataFrame (or list of dicts) of new months, continuing the calendar
+    if not raw_path.endswith('.csv'):
+        raise ValueError(f"{raw_path}: months can only be appended to a CSV source")
+    rows = validate(pd.DataFrame(rows), 'new rows')
+    existing = read_raw(raw_path)
+    validate(pd.concat([existing, rows], ignore_index=True), f"{raw_path} + new rows")
+    rows.assign(Year=rows['Year'].dt.strftime('%Y-%m-%d')).to_csv(
+        raw_path, mode='a', header=False, index=False)
+    return ingest(raw_path, store_dir)
+
+# ------------------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the lagged feature store from the raw series.")
+    parser.add_argument('--raw', default=RAW_PATH, help="raw series (CSV or workbook)")
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--append', nargs=1 + len(RAW_COLUMNS), metavar=('DATE', *RAW_COLUMNS),
+                        help="append one month to the raw CSV before building")
+    args = parser.parse_args(argv)
+
+    if args.append:
+        date, *values = args.append
+        row = {'Year': pd.Timestamp(date), **{c: float(v) for c, v in zip(RAW_COLUMNS, values)}}
+        meta = append_raw([row], args.raw, args.store)
+    else:
+        meta = ingest(args.raw, args.store)
+    print(f"features {meta['version']}: {meta['rows']} months {meta['first']} .. {meta['last']} "
+          f"-> {os.path.join(args.store, meta['file'])}")
+
+if __name__ == '__main__':
+    main()
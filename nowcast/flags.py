@@ -0,0 +1,45 @@
+# nowcast/flags.py
+#
+# Landing-page flag grid. The twelve PNGs are resized and base64-encoded once
+# into a single HTML block (cached by nowcast/app.py and built by the
+# warm-up), so a landing rerun sends one markdown element instead of twelve
+# images plus twelve buttons. The country is picked with one radio widget.
+
+import base64
+import io
+import os
+
+from PIL import Image
+
+from nowcast.metrics import timed
+
+FLAG_DIR = 'Flags'
+COUNTRIES = ["Algeria","Bahrain","Egypt","Jordan","Kuwait","Lebanon",
+             "Morocco","Oman","Qatar","Saudi","Tunisia","UAE"]
+WIDTH = 160  # px, about the width of one of six columns on a wide page
+
+def encode(path, width=WIDTH):
+    # Resized PNG as a data URI
+    with Image.open(path) as img:
+        img = img.convert('RGBA')
+        img.thumbnail((width, width))
+        buf = io.BytesIO()
+        img.save(buf, format='PNG', optimize=True)
+    return 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+
+@timed('flag_grid', 'chart')
+def grid_html(countries=COUNTRIES, flag_dir=FLAG_DIR, per_row=6):
+    cells = ''.join(
+        f"<figure class='flag-cell'><img src='{encode(os.path.join(flag_dir, f'{c}.png'))}' alt='{c}'>"
+        f"<figcaption>{c}</figcaption></figure>"
+        for c in countries
+    )
+    return (
+        "<style>"
+        f".flag-grid {{ display: grid; grid-template-columns: repeat({per_row}, 1fr); gap: 30px 16px; margin-bottom: 30px; }}"
+        ".flag-cell { margin: 0; text-align: center; }"
+        ".flag-cell img { width: 100%; height: auto; }"
+        ".flag-cell figcaption { margin-top: 0.4rem; font-weight: 600; }"
+        "</style>"
+        f"<div class='flag-grid'>{cells}</div>"
+    )
@@ -0,0 +1,54 @@
+# nowcast/food_bill.py
+#
+# Food import bill, reserves cover (NIR) and subsidy responsiveness, driven by
+# the average forecast inflation. Every function accepts a scalar or a numpy
+# array of average inflations so batch runs evaluate all scenarios at once.
+
+import numpy as np
+
+# Reserves cover for 2025 (see pages/03_Food Prices.py)
+NON_FOOD_OFFSET = 16046071327      # subtracted from the food bill
+OTHER_IMPORTS_MILLIONS = 72134     # added back, in millions
+RESERVES_MILLIONS = 46385
+
+# Subsidy responsiveness (see pages/04_Subsidies.py)
+SUBSIDY_INDEX = 117.675118055328
+SUBSIDY_BASE = 133278000000
+
+# ------------------------------------------------------------------------------
+# Food prices
+# ------------------------------------------------------------------------------
+def average_inflation(df_fc):
+    return np.mean(df_fc['Inflation'])
+
+def adjust_food_prices(food_prices_df, avg_inflation):
+    # Returns a new frame with 'Adjusted Price' and 'Total Value' columns
+    # (cached baskets may be float32; money is computed in float64)
+    inflation_rate = avg_inflation / 100
+    adjusted = food_prices_df['Price'].astype(np.float64) * (1 + inflation_rate)
+    return food_prices_df.assign(**{
+        'Adjusted Price': adjusted,
+        'Total Value': adjusted * food_prices_df['Quantity'].astype(np.float64),
+    })
+
+def base_food_bill(food_prices_df):
+    return float((food_prices_df['Price'].astype(np.float64)
+                  * food_prices_df['Quantity'].astype(np.float64)).sum())
+
+def total_food_bill(base_bill, avg_inflation):
+    return base_bill * (1 + avg_inflation / 100)
+
+# ------------------------------------------------------------------------------
+# Months of imports covered by reserves
+# ------------------------------------------------------------------------------
+def nir_cover(total_value_all_food):
+    adjusted_value_in_millions = (total_value_all_food - NON_FOOD_OFFSET) / 1000000
+    monthly_value = (adjusted_value_in_millions + OTHER_IMPORTS_MILLIONS) / 12
+    return RESERVES_MILLIONS / monthly_value
+
+# ------------------------------------------------------------------------------
+# Subsidy
+# ------------------------------------------------------------------------------
+def subsidy_value(avg_inflation):
+    adjusted_value = SUBSIDY_INDEX * (1 + avg_inflation / 100)
+    return (adjusted_value * SUBSIDY_BASE) / SUBSIDY_INDEX
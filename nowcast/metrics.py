@@ -0,0 +1,250 @@
+# nowcast/metrics.py
+#
+# Process-wide performance metrics: operation timings (data loads, model
+# fit/predict, chart builds, external fetches, page reruns), cache hit/miss
+# counts and per-session memory. Rendered in Prometheus text format for the
+# Diagnostics page, a scrape endpoint and/or a textfile-collector file.
+#
+#   NOWCAST_METRICS_PORT=9464          serve /metrics (and /ready) on that port
+#   NOWCAST_METRICS_HOST=0.0.0.0       bind address (default 127.0.0.1; the
+#                                      output names sessions, unauthenticated)
+#   NOWCAST_METRICS_FILE=/path/x.prom  rewrite that file every 15 s
+
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+SAMPLES = 2048          # timings kept per operation for the percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+SESSION_TTL = float(os.environ.get('NOWCAST_SESSION_TTL', 900))  # s without a rerun
+
+# ------------------------------------------------------------------------------
+# Registry
+# ------------------------------------------------------------------------------
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=SAMPLES))
+        self.totals = defaultdict(lambda: [0, 0.0])        # (kind, op) -> [count, sum]
+        self.cache = defaultdict(lambda: [0, 0])           # name -> [hits, misses]
+        self.session_memory = {}                           # session id -> bytes
+        self.session_seen = {}                             # session id -> last update
+        self.readiness = {'ready': False}                  # see nowcast/warmup.py
+
+    def observe(self, kind, op, seconds):
+        with self._lock:
+            self.samples[(kind, op)].append(seconds)
+            total = self.totals[(kind, op)]
+            total[0] += 1
+            total[1] += seconds
+
+    def cache_result(self, name, hit):
+        with self._lock:
+            self.cache[name][0 if hit else 1] += 1
+
+    def set_session_memory(self, session_id, nbytes):
+        with self._lock:
+            self.session_memory[session_id] = nbytes
+            self.session_seen[session_id] = time.monotonic()
+
+    def set_readiness(self, status):
+        with self._lock:
+            self.readiness = dict(status)
+
+    def drop_session(self, session_id):
+        with self._lock:
+            self.session_memory.pop(session_id, None)
+            self.session_seen.pop(session_id, None)
+
+    def sweep_sessions(self, is_active=None, ttl=SESSION_TTL):
+        # Drop sessions idle for more than ttl seconds, or that is_active(id)
+        # reports as ended, so the per-session label set stays bounded
+        now = time.monotonic()
+        with self._lock:
+            seen = dict(self.session_seen)
+        for sid, last in seen.items():
+            if now - last > ttl or (is_active is not None and not is_active(sid)):
+                self.drop_session(sid)
+
+    def timing_rows(self):
+        with self._lock:
+            items = [(k, list(v), self.totals[k]) for k, v in self.samples.items()]
+        rows = []
+        for (kind, op), samples, (count, total) in sorted(items):
+            qs = np.quantile(samples, QUANTILES) if samples else [0.0] * len(QUANTILES)
+            rows.append({'kind': kind, 'op': op, 'count': count, 'mean_s': total / count,
+                         'p50_s': qs[0], 'p95_s': qs[1], 'p99_s': qs[2]})
+        return rows
+
+    def session_rows(self):
+        # Snapshot of the per-session gauges, safe while sessions update them
+        with self._lock:
+            return sorted(self.session_memory.items())
+
+    def cache_rows(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self.cache.items())
+        return [{'cache': name, 'hits': h, 'misses': m,
+                 'hit_rate': h / (h + m) if h + m else 0.0} for name, (h, m) in items]
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.totals.clear()
+            self.cache.clear()
+            self.session_memory.clear()
+            self.session_seen.clear()
+
+REGISTRY = Registry()
+
+# ------------------------------------------------------------------------------
+# Instrumentation helpers
+# ------------------------------------------------------------------------------
+class timed:
+    # with timed('train_model', 'model'): ...   or   @timed('load_food_prices')
+    def __init__(self, op, kind='load'):
+        self.op, self.kind = op, kind
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self._start
+        REGISTRY.observe(self.kind, self.op, self.elapsed)
+        return False
+
+    def __call__(self, fn):
+        # A fresh timer per call, so decorated functions are thread-safe
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with timed(self.op, self.kind):
+                return fn(*args, **kwargs)
+        return inner
+
+def track_cache(name, cache_decorator):
+    # Wraps a Streamlit cache decorator so misses (the body runs) and hits
+    # (the call returns without running it) are counted.
+    def decorate(fn):
+        ran = threading.local()
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            ran.flag = True
+            return fn(*args, **kwargs)
+        cached = cache_decorator(body)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            ran.flag = False
+            result = cached(*args, **kwargs)
+            REGISTRY.cache_result(name, hit=not ran.flag)
+            return result
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorate
+
+def object_nbytes(obj):
+    # Rough deep size of what sessions keep in session_state
+    if hasattr(obj, 'memory_usage'):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(object_nbytes(k) + object_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sum(object_nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+# ------------------------------------------------------------------------------
+# Prometheus text format
+# ------------------------------------------------------------------------------
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+def render_prometheus():
+    lines = ['# HELP nowcast_duration_seconds Duration of instrumented operations.',
+             '# TYPE nowcast_duration_seconds summary']
+    for r in REGISTRY.timing_rows():
+        labels = f'kind="{_label(r["kind"])}",op="{_label(r["op"])}"'
+        for q, key in zip(QUANTILES, ('p50_s', 'p95_s', 'p99_s')):
+            lines.append(f'nowcast_duration_seconds{{{labels},quantile="{q}"}} {r[key]:.6f}')
+        lines.append(f'nowcast_duration_seconds_sum{{{labels}}} {r["mean_s"] * r["count"]:.6f}')
+        lines.append(f'nowcast_duration_seconds_count{{{labels}}} {r["count"]}')
+
+    lines += ['# HELP nowcast_cache_requests_total Cache lookups by result.',
+              '# TYPE nowcast_cache_requests_total counter']
+    for r in REGISTRY.cache_rows():
+        lines.append(f'nowcast_cache_requests_total{{cache="{_label(r["cache"])}",result="hit"}} {r["hits"]}')
+        lines.append(f'nowcast_cache_requests_total{{cache="{_label(r["cache"])}",result="miss"}} {r["misses"]}')
+
+    REGISTRY.sweep_sessions()
+    sessions = REGISTRY.session_rows()
+    lines += ['# HELP nowcast_session_memory_bytes Estimated session_state size per session.',
+              '# TYPE nowcast_session_memory_bytes gauge']
+    for sid, nbytes in sessions:
+        lines.append(f'nowcast_session_memory_bytes{{session="{_label(sid)}"}} {nbytes}')
+    lines += ['# HELP nowcast_sessions Sessions with a memory sample.',
+              '# TYPE nowcast_sessions gauge',
+              f'nowcast_sessions {len(sessions)}']
+    lines += ['# HELP nowcast_ready 1 once the start-up warm-up has filled the caches.',
+              '# TYPE nowcast_ready gauge',
+              f"nowcast_ready {int(REGISTRY.readiness['ready'])}"]
+    return '\n'.join(lines) + '\n'
+
+def write_prometheus(path):
+    # Unique temp file per writer (nowcast.cache.write_atomic imports this module)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+# ------------------------------------------------------------------------------
+# Export: scrape endpoint and/or textfile, both optional
+# ------------------------------------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            status, ctype, payload = 200, 'text/plain; version=0.0.4', render_prometheus().encode()
+        elif self.path == '/ready':
+            # For load balancers: 503 until the warm-up has finished
+            with REGISTRY._lock:
+                readiness = dict(REGISTRY.readiness)
+            status = 200 if readiness['ready'] else 503
+            ctype, payload = 'application/json', json.dumps(readiness).encode()
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_exporter(port=None, path=None, interval=15.0, host=None):
+    port = port or os.environ.get('NOWCAST_METRICS_PORT')
+    path = path or os.environ.get('NOWCAST_METRICS_FILE')
+    host = host or os.environ.get('NOWCAST_METRICS_HOST', '127.0.0.1')
+    if port:
+        server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    if path:
+        def loop():
+            while True:
+                write_prometheus(path)
+                time.sleep(interval)
+        threading.Thread(target=loop, name='metrics-file', daemon=True).start()
+    return {'host': host, 'port': port, 'path': path}
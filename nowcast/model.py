@@ -0,0 +1,92 @@
+# nowcast/model.py
+#
+# Ridge model for Egypt food inflation and the recursive 12-month forecast.
+# The fitted pipeline (StandardScaler + Ridge) is linear, so the forecast is
+# evaluated from its folded coefficients: one step of the recursion is a dot
+# product, and many scenarios can be advanced together as numpy arrays.
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import Ridge
+
+from nowcast.metrics import timed
+
+FEATURES = [
+    'Exchange Rate Growth', 'Global Inflation',
+    'Egypt Inflation Lag1', 'Egypt Inflation Lag2',
+    'Global Inflation Lag1'
+]
+TARGET = 'Egypt Inflation'
+N_PERIODS = 12
+ALPHA = 0.001
+
+# ------------------------------------------------------------------------------
+# Training
+# ------------------------------------------------------------------------------
+@timed('train_model', 'model')
+def train_model(df):
+    model = Pipeline([
+        ('scaler', StandardScaler()),
+        ('ridge', Ridge(alpha=ALPHA, random_state=42))
+    ])
+    model.fit(df[FEATURES], df[TARGET])
+    return model
+
+def linear_coefficients(model):
+    # Fold the scaler into the ridge weights: y = intercept + x @ coef
+    scaler, ridge = model.named_steps['scaler'], model.named_steps['ridge']
+    coef = ridge.coef_ / scaler.scale_
+    intercept = float(ridge.intercept_ - np.dot(coef, scaler.mean_))
+    return intercept, coef
+
+# ------------------------------------------------------------------------------
+# Forecast calendar and starting state
+# ------------------------------------------------------------------------------
+def forecast_dates(df_hist, n_periods=N_PERIODS):
+    start_date = df_hist.iloc[-1]['Year'] + pd.DateOffset(months=1)
+    return [start_date + pd.DateOffset(months=i) for i in range(n_periods)]
+
+def initial_state(df_hist):
+    last = df_hist.iloc[-1]
+    # (Egypt Inflation Lag1, Egypt Inflation Lag2, Global Inflation Lag1)
+    return (float(last['Egypt Inflation']),
+            float(last['Egypt Inflation Lag1']),
+            float(last['Global Inflation']))
+
+# ------------------------------------------------------------------------------
+# Recursive forecast
+# ------------------------------------------------------------------------------
+@timed('forecast_batch', 'model')
+def forecast_batch(coefs, state, exrg, gi, n_periods=N_PERIODS):
+    # exrg / gi: one value per scenario (held flat over the horizon) or one
+    # row per scenario with a value per month. Returns (n_scenarios, n_periods).
+    intercept, coef = coefs
+    exrg = np.asarray(exrg, dtype=float)
+    gi = np.asarray(gi, dtype=float)
+    if exrg.ndim == 1:
+        exrg = np.repeat(exrg[:, None], n_periods, axis=1)
+    if gi.ndim == 1:
+        gi = np.repeat(gi[:, None], n_periods, axis=1)
+    n = exrg.shape[0]
+
+    ei_lag1 = np.full(n, state[0])
+    ei_lag2 = np.full(n, state[1])
+    gi_lag1 = np.full(n, state[2])
+    out = np.empty((n, n_periods))
+    for i in range(n_periods):
+        pred = (intercept
+                + coef[0] * exrg[:, i] + coef[1] * gi[:, i]
+                + coef[2] * ei_lag1 + coef[3] * ei_lag2
+                + coef[4] * gi_lag1)
+        out[:, i] = pred
+        ei_lag2, ei_lag1 = ei_lag1, pred
+        gi_lag1 = gi[:, i]
+    return out
+
+def forecast_frame(model, df_hist, exrg, gi, n_periods=N_PERIODS):
+    # Single scenario, shaped like the page's df_fc (Year, Inflation)
+    path = forecast_batch(linear_coefficients(model), initial_state(df_hist),
+                          [exrg], [gi], n_periods)[0]
+    return pd.DataFrame({'Year': forecast_dates(df_hist, n_periods), 'Inflation': path})
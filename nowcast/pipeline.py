@@ -0,0 +1,89 @@
+# nowcast/pipeline.py
+#
+# The nowcast -> food bill -> NIR -> subsidy pipeline as a pure function of a
+# small context (folded model coefficients, starting lags, forecast calendar and
+# base food bill). The context is saved as a JSON artifact so the batch runner,
+# the forecast service and any other process share one fitted model instead of
+# each re-reading the workbooks and refitting.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from nowcast import data, features, food_bill, model as nc_model
+from nowcast.cache import CACHE_DIR, write_atomic
+
+ARTIFACT_PATH = os.path.join(CACHE_DIR, 'model_context.json')
+SOURCES = [features.RAW_PATH, data.FOOD_PRICES_XLSX]
+
+# ------------------------------------------------------------------------------
+# Context: everything needed to evaluate scenarios, small enough to pickle
+# ------------------------------------------------------------------------------
+def context_from_model(model, df_hist, food_prices_df, n_periods=nc_model.N_PERIODS):
+    return {
+        'coefs': nc_model.linear_coefficients(model),
+        'state': nc_model.initial_state(df_hist),
+        'dates': nc_model.forecast_dates(df_hist, n_periods),
+        'base_bill': food_bill.base_food_bill(food_prices_df),
+        'n_periods': n_periods,
+    }
+
+def build_context(n_periods=nc_model.N_PERIODS):
+    df_hist = data.load_training_frame()
+    model = nc_model.train_model(df_hist)
+    return context_from_model(model, df_hist, data.load_food_prices(), n_periods)
+
+def _sources_mtime():
+    return max(os.path.getmtime(p) for p in SOURCES)
+
+def save_context(ctx, path=ARTIFACT_PATH):
+    intercept, coef = ctx['coefs']
+    payload = {
+        'intercept': intercept,
+        'coef': [float(c) for c in coef],
+        'state': list(ctx['state']),
+        'dates': [d.isoformat() for d in ctx['dates']],
+        'base_bill': ctx['base_bill'],
+        'n_periods': ctx['n_periods'],
+        'sources_mtime': _sources_mtime(),
+    }
+    write_atomic(path, lambda f: json.dump(payload, f))
+
+def load_context(path=ARTIFACT_PATH):
+    # Reuse the artifact unless a source file changed since it was written
+    if os.path.exists(path):
+        with open(path) as f:
+            payload = json.load(f)
+        if payload['sources_mtime'] >= _sources_mtime():
+            return {
+                'coefs': (payload['intercept'], np.array(payload['coef'])),
+                'state': tuple(payload['state']),
+                'dates': [pd.Timestamp(d) for d in payload['dates']],
+                'base_bill': payload['base_bill'],
+                'n_periods': payload['n_periods'],
+            }
+    ctx = build_context()
+    save_context(ctx, path)
+    return ctx
+
+# ------------------------------------------------------------------------------
+# Vectorized evaluation of many scenarios
+# ------------------------------------------------------------------------------
+def evaluate(ctx, exrg, gi):
+    # exrg / gi: (n,) flat inputs or (n, n_periods) monthly paths
+    paths = nc_model.forecast_batch(ctx['coefs'], ctx['state'], exrg, gi, ctx['n_periods'])
+    return {'inflation': paths, **downstream(ctx, paths)}
+
+def downstream(ctx, paths):
+    # Food bill, NIR cover and subsidy from inflation paths (..., n_periods),
+    # e.g. a stored forecast
+    avg_inflation = np.asarray(paths).mean(axis=-1)
+    total_bill = food_bill.total_food_bill(ctx['base_bill'], avg_inflation)
+    return {
+        'average_inflation': avg_inflation,
+        'total_food_bill': total_bill,
+        'nir_cover': food_bill.nir_cover(total_bill),
+        'subsidy': food_bill.subsidy_value(avg_inflation),
+    }
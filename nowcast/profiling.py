@@ -0,0 +1,182 @@
+# nowcast/profiling.py
+#
+# On-demand profiler for a single rerun. Logged-in users add ?profile=1 to a
+# page URL; that session's next rerun is profiled with cProfile (which only
+# sees the calling thread, so other sessions are untouched) plus a stack
+# sampler on the same thread for a flamegraph. The parameter is removed once
+# the profile starts, so only that one rerun is profiled. Files go to
+# .cache/profiles (the newest MAX_PROFILES are kept):
+#
+#   <page>-<stamp>.pstats   python -m pstats / snakeviz
+#   <page>-<stamp>.folded   collapsed stacks for flamegraph.pl / speedscope
+#
+# ?profile=mem also records allocations with tracemalloc. tracemalloc is
+# process-wide: it slows every session while it runs and its figures can
+# include other sessions' work. Overlapping profiles share it through a
+# reference count, so it stays on until the last of them has finished.
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import pandas as pd
+import streamlit as st
+
+from nowcast.cache import CACHE_DIR
+
+PROFILE_DIR = os.path.join(CACHE_DIR, 'profiles')
+SAMPLE_INTERVAL = 0.005
+TOP_N = 15
+MAX_PROFILES = 50
+
+# ------------------------------------------------------------------------------
+# Stack sampler (flamegraph input)
+# ------------------------------------------------------------------------------
+class StackSampler:
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rerun-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        return ''.join(f"{stack} {n}\n" for stack, n in self.counts.most_common())
+
+# ------------------------------------------------------------------------------
+# Shared tracemalloc (process-wide, reference counted across sessions)
+# ------------------------------------------------------------------------------
+_trace_lock = threading.Lock()
+_trace_users = 0
+_trace_external = False  # tracing was already on (e.g. -X tracemalloc): never stop it
+
+def _acquire_tracemalloc():
+    global _trace_users, _trace_external
+    with _trace_lock:
+        if _trace_users == 0:
+            _trace_external = tracemalloc.is_tracing()
+            if not _trace_external:
+                tracemalloc.start(10)
+        _trace_users += 1
+        return tracemalloc.take_snapshot()
+
+def _release_tracemalloc(snapshot):
+    # Net allocations since snapshot; stops tracing with the last user
+    global _trace_users
+    with _trace_lock:
+        allocations = tracemalloc.take_snapshot().compare_to(snapshot, 'lineno')
+        _trace_users -= 1
+        if _trace_users == 0 and not _trace_external:
+            tracemalloc.stop()
+        return allocations
+
+# ------------------------------------------------------------------------------
+# Start / finish, called from app.begin_rerun / app.end_rerun
+# ------------------------------------------------------------------------------
+def requested():
+    # None, 'cpu' (?profile=1) or 'mem' (?profile=mem, adds tracemalloc)
+    if not st.session_state.get('authenticated'):
+        return None
+    return {'1': 'cpu', 'mem': 'mem'}.get(st.query_params.get('profile'))
+
+def start(page):
+    # A profile left over from a rerun cut short by an exception is saved first
+    if '_profile' in st.session_state:
+        finish(render=False)
+    mode = requested()
+    if mode is None:
+        return
+    del st.query_params['profile']  # one profiled rerun per request
+    profiler = cProfile.Profile()
+    st.session_state['_profile'] = {
+        'page': page,
+        'stamp': time.strftime('%Y%m%d-%H%M%S'),
+        'profiler': profiler,
+        'sampler': StackSampler(threading.get_ident()).start(),
+        'snapshot': _acquire_tracemalloc() if mode == 'mem' else None,
+        'start': time.perf_counter(),
+    }
+    profiler.enable()
+
+def finish(render=True):
+    prof = st.session_state.pop('_profile', None)
+    if prof is None:
+        return None
+    prof['profiler'].disable()
+    elapsed = time.perf_counter() - prof['start']
+    prof['sampler'].stop()
+    allocations = _release_tracemalloc(prof['snapshot']) if prof['snapshot'] is not None else None
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{prof['page'].replace(' ', '_')}-{prof['stamp']}")
+    stats = pstats.Stats(prof['profiler'])
+    stats.dump_stats(base + '.pstats')
+    with open(base + '.folded', 'w') as f:
+        f.write(prof['sampler'].folded())
+    prune()
+
+    if render:
+        show(stats, allocations, elapsed, base)
+    return base
+
+def prune(profile_dir=PROFILE_DIR, keep=MAX_PROFILES):
+    # Keep the newest `keep` profiles (.pstats + .folded pairs)
+    saved = {}
+    for name in os.listdir(profile_dir):
+        base, ext = os.path.splitext(name)
+        if ext in ('.pstats', '.folded'):
+            try:
+                mtime = os.path.getmtime(os.path.join(profile_dir, name))
+            except FileNotFoundError:  # pruned by another session
+                continue
+            saved[base] = max(saved.get(base, 0.0), mtime)
+    for base in sorted(saved, key=saved.get)[:-keep]:
+        for ext in ('.pstats', '.folded'):
+            try:
+                os.remove(os.path.join(profile_dir, base + ext))
+            except FileNotFoundError:
+                pass
+
+def hotspots(stats, n=TOP_N):
+    rows = [{'function': f"{name} ({os.path.basename(filename)}:{line})",
+             'calls': nc, 'own (ms)': tt * 1000, 'cumulative (ms)': ct * 1000}
+            for (filename, line, name), (cc, nc, tt, ct, callers) in stats.stats.items()]
+    return pd.DataFrame(rows).sort_values('own (ms)', ascending=False).head(n)
+
+def show(stats, allocations, elapsed, base):
+    with st.expander(f"Profile of this rerun ({elapsed * 1000:.0f} ms)", expanded=True):
+        st.caption(f"Saved {base}.pstats and {base}.folded")
+        st.markdown("**Top functions by own time**")
+        st.dataframe(hotspots(stats).round(2), hide_index=True, use_container_width=True)
+        if allocations is None:
+            st.caption("Add ?profile=mem to the URL to include allocations.")
+            return
+        st.markdown("**Top allocations (net, by line)**")
+        st.dataframe(pd.DataFrame([
+            {'line': str(a.traceback[0]), 'size (KB)': a.size_diff / 1024, 'blocks': a.count_diff}
+            for a in allocations[:TOP_N]
+        ]).round(1), hide_index=True, use_container_width=True)
@@ -0,0 +1,41 @@
+# nowcast/serve.py
+#
+# Launch the Streamlit app with the caches warmed in the same process:
+#
+#   NOWCAST_METRICS_PORT=9464 python -m nowcast.serve --server.port 8501
+#   python -m nowcast.serve --wait          # warm fully before serving
+#
+# Without --wait the warm-up runs on a background thread while the server
+# starts; point the load balancer's health check at :9464/ready (or watch
+# .cache/ready.json) so traffic only arrives once it has finished. The
+# endpoint listens on 127.0.0.1 unless NOWCAST_METRICS_HOST says otherwise.
+# Any other arguments are passed to `streamlit run`.
+
+import argparse
+import sys
+
+from streamlit.web import cli as stcli
+
+from nowcast import app, warmup
+
+MAIN_SCRIPT = 'Data Exploration.py'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm the caches and run the Streamlit app.")
+    parser.add_argument('--wait', action='store_true', help="finish the warm-up before starting the server")
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    app.metrics_exporter()  # /ready is served next to /metrics
+    if args.wait:
+        status = warmup.warm()
+        if not status['ready']:
+            print(f"Warm-up failed: {status['errors']}", file=sys.stderr)
+            return 1
+    else:
+        warmup.start()
+
+    sys.argv = ['streamlit', 'run', MAIN_SCRIPT, *streamlit_args]
+    return stcli.main()
+
+if __name__ == '__main__':
+    sys.exit(main())
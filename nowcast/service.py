@@ -0,0 +1,189 @@
+# nowcast/service.py
+#
+# Local HTTP/JSON forecast service for other internal tools.
+#
+#   python -m nowcast.service --port 8600
+#
+#   POST /forecast   {"exchange_rate_growth": 2.0, "global_inflation": 1.5}
+#   POST /nowcast | /food-bill | /nir | /subsidy   (same body, subset of fields)
+#   GET  /health
+#
+# Inputs are a single value (held for 12 months, as on the Nowcasting page) or
+# a list of 12 monthly values. Requests that arrive within a few milliseconds of
+# each other are coalesced into one vectorized pipeline evaluation. Forecasts
+# go to the shared forecast store (nowcast/store.py) under the same scenario
+# hash the app uses, so the returned "scenario" opens in the pages as
+# ?scenario=<hash> and scenarios run in the app are served from disk here. The
+# model comes from the shared context artifact (see nowcast/pipeline.py).
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from nowcast import pipeline
+from nowcast.cache import context_version, scenario_key, scenario_paths
+from nowcast.store import ForecastStore
+
+ROUTES = {
+    '/forecast': None,
+    '/nowcast': ['dates', 'inflation', 'average_inflation'],
+    '/food-bill': ['average_inflation', 'total_food_bill'],
+    '/nir': ['total_food_bill', 'nir_cover'],
+    '/subsidy': ['average_inflation', 'subsidy'],
+}
+
+# ------------------------------------------------------------------------------
+# Micro-batching: one evaluation for every request queued within `window`
+# ------------------------------------------------------------------------------
+class MicroBatcher:
+    def __init__(self, ctx, window=0.003, max_batch=1024):
+        self.ctx = ctx
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._loop, name='nowcast-batcher', daemon=True).start()
+
+    def submit(self, exrg, gi):
+        fut = Future()
+        self._queue.put((exrg, gi, fut))
+        return fut
+
+    def _collect(self):
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(items) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return items
+
+    def _loop(self):
+        while True:
+            items = self._collect()
+            try:
+                res = pipeline.evaluate(self.ctx,
+                                        np.stack([it[0] for it in items]),
+                                        np.stack([it[1] for it in items]))
+            except Exception as e:
+                for _, _, fut in items:
+                    fut.set_exception(e)
+                continue
+            self.batches += 1
+            for j, (_, _, fut) in enumerate(items):
+                fut.set_result({k: v[j] for k, v in res.items()})
+
+# ------------------------------------------------------------------------------
+# Service: forecast store lookup, then the batcher
+# ------------------------------------------------------------------------------
+def _stored_input(path):
+    # As the app stores it: a float when held flat, else the monthly values
+    return float(path[0]) if (path == path[0]).all() else [float(v) for v in path]
+
+class ForecastService:
+    def __init__(self, ctx=None, window=0.003, cache_size=10000, store=None):
+        self.ctx = ctx or pipeline.load_context()
+        self.version = context_version(self.ctx)
+        self.store = store or ForecastStore(maxsize=cache_size)
+        self.batcher = MicroBatcher(self.ctx, window)
+        self._dates = [d.strftime('%Y-%m') for d in self.ctx['dates']]
+
+    def forecast(self, exrg=0.0, gi=0.0, timeout=5.0):
+        n_periods = self.ctx['n_periods']
+        exrg, gi = scenario_paths(exrg, gi, n_periods)
+        if not (np.isfinite(exrg).all() and np.isfinite(gi).all()):
+            raise ValueError("inputs must be finite numbers")
+        key = scenario_key(exrg, gi, n_periods, self.version)
+        entry = self.store.get(key)
+        if entry is None:
+            res = self.batcher.submit(exrg, gi).result(timeout)
+            if not all(np.isfinite(v).all() for v in res.values()):
+                raise ValueError("inputs out of range: the forecast is not finite")
+            df_fc = pd.DataFrame({'Year': self.ctx['dates'], 'Inflation': res['inflation']})
+            entry = self.store.put(key, df_fc, _stored_input(exrg), _stored_input(gi))
+        inflation = entry['df_fc']['Inflation'].to_numpy()
+        res = pipeline.downstream(self.ctx, inflation)
+        return {
+            'scenario': key,
+            'dates': self._dates,
+            'inflation': inflation.tolist(),
+            **{k: float(v) for k, v in res.items()},
+        }
+
+# ------------------------------------------------------------------------------
+# HTTP front end
+# ------------------------------------------------------------------------------
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, body):
+            payload = json.dumps(body, allow_nan=False).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, {'status': 'ok', 'model': service.version,
+                                 'cached': len(service.store)})
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path not in ROUTES:
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                result = service.forecast(body.get('exchange_rate_growth', 0.0),
+                                          body.get('global_inflation', 0.0))
+            except (ValueError, TypeError, AttributeError) as e:
+                self._send(400, {'error': str(e)})
+                return
+            except FutureTimeoutError:
+                self._send(503, {'error': 'forecast timed out, retry later'})
+                return
+            fields = ROUTES[self.path]
+            if fields is not None:
+                result = {'scenario': result['scenario'], **{k: result[k] for k in fields}}
+            self._send(200, result)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+class ForecastServer(ThreadingHTTPServer):
+    # socketserver's default listen backlog (5) resets bursts of connections
+    request_queue_size = 1024
+    daemon_threads = True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve nowcast forecasts over HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--window-ms', type=float, default=3.0,
+                        help="how long to wait for more requests before evaluating a batch")
+    args = parser.parse_args(argv)
+    service = ForecastService(window=args.window_ms / 1000)
+    server = ForecastServer((args.host, args.port), make_handler(service))
+    print(f"Serving forecasts on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# nowcast/statespace.py
+#
+# State-space form of the app's forecast recursion (nowcast/model.py). The
+# folded Ridge model
+#
+#   y[t] = c + a0*x[t] + a1*g[t] + b1*y[t-1] + b2*y[t-2] + a4*g[t-1]
+#
+# (y Egypt inflation, x exchange rate growth, g global inflation) is linear in
+# its own lags, so with the inputs held flat one month is a fixed transition
+# of the augmented state
+#
+#   z[t] = (y[t], y[t-1], g[t-1], x, g, 1)
+#
+# and the h-step forecast is the first element of A^h z[0]. A^h is built by
+# repeated squaring (O(log h) 6x6 products, shared by every scenario), so a
+# 10-year horizon costs about the same as a 12-month one. The lag block of A
+# gives stability, the steady state and impulse responses in closed form.
+
+import numpy as np
+
+from nowcast.metrics import timed
+
+SHOCKS = ['Exchange Rate Growth', 'Global Inflation']
+
+# ------------------------------------------------------------------------------
+# Matrices
+# ------------------------------------------------------------------------------
+def transition(coefs):
+    # A: z[t+1] = A @ z[t]
+    intercept, coef = coefs
+    a0, a1, b1, b2, a4 = coef
+    return np.array([
+        [b1, b2, a4, a0, a1, intercept],
+        [1., 0., 0., 0., 0., 0.],
+        [0., 0., 0., 0., 1., 0.],
+        [0., 0., 0., 1., 0., 0.],
+        [0., 0., 0., 0., 1., 0.],
+        [0., 0., 0., 0., 0., 1.],
+    ])
+
+def companion(coefs):
+    # Own-lag block of A: (y[t], y[t-1]) -> (y[t+1], y[t])
+    _, coef = coefs
+    return np.array([[coef[2], coef[3]], [1., 0.]])
+
+def initial_states(state, exrg, gi):
+    # One z[0] row per scenario; state as model.initial_state()
+    exrg = np.asarray(exrg, dtype=float)
+    gi = np.asarray(gi, dtype=float)
+    z = np.empty((len(exrg), 6))
+    z[:, :3] = state
+    z[:, 3], z[:, 4], z[:, 5] = exrg, gi, 1.
+    return z
+
+def _powers(M, horizons):
+    # M^h for every h in horizons, (len(horizons), k, k). Through the
+    # eigendecomposition when it is well conditioned, otherwise by repeated
+    # squaring per horizon.
+    horizons = np.asarray(horizons)
+    w, V = np.linalg.eig(M)
+    if np.linalg.cond(V) < 1e8:
+        V_inv = np.linalg.inv(V)
+        P = np.einsum('ij,hj,jk->hik', V, w[None, :] ** horizons[:, None], V_inv)
+        return P.real
+    return np.stack([np.linalg.matrix_power(M, int(h)) for h in horizons])
+
+# ------------------------------------------------------------------------------
+# Forecasts
+# ------------------------------------------------------------------------------
+@timed('statespace_forecast', 'model')
+def forecast_at(coefs, state, exrg, gi, horizons):
+    # exrg / gi: one flat value per scenario. horizons: an int (returns (n,))
+    # or a sequence of months ahead (returns (n, len(horizons))).
+    z = initial_states(state, exrg, gi)
+    A = transition(coefs)
+    if np.ndim(horizons) == 0:
+        return z @ np.linalg.matrix_power(A, int(horizons))[0]
+    return z @ _powers(A, horizons)[:, 0, :].T
+
+def stability(coefs):
+    # Roots of the lag polynomial: stable when every modulus is below one;
+    # the half-life is the months for a deviation to halve
+    roots = np.linalg.eigvals(companion(coefs))
+    radius = float(np.abs(roots).max())
+    stable = radius < 1
+    half_life = float(np.log(0.5) / np.log(radius)) if 0 < radius < 1 else np.nan
+    return {'roots': roots, 'radius': radius, 'stable': stable, 'half_life': half_life}
+
+def long_run_multipliers(coefs):
+    # Steady-state response to a permanent one-point rise in each input
+    _, coef = coefs
+    denom = 1 - coef[2] - coef[3]
+    return {'Exchange Rate Growth': coef[0] / denom,
+            'Global Inflation': (coef[1] + coef[4]) / denom}
+
+def steady_state(coefs, exrg, gi):
+    # Long-run inflation with the inputs held flat; ValueError if the model
+    # is not stable (the fixed point exists but is never reached)
+    if not stability(coefs)['stable']:
+        raise ValueError("model is not stable: no long-run steady state")
+    intercept, coef = coefs
+    exrg = np.asarray(exrg, dtype=float)
+    gi = np.asarray(gi, dtype=float)
+    return (intercept + coef[0] * exrg + (coef[1] + coef[4]) * gi) / (1 - coef[2] - coef[3])
+
+# ------------------------------------------------------------------------------
+# Impulse responses
+# ------------------------------------------------------------------------------
+@timed('impulse_responses', 'model')
+def impulse_responses(coefs, horizon=60, permanent=False):
+    # Response of inflation, months 0..horizon, to a one-point shock in each
+    # input in month 0 (one-off), or from month 0 on (permanent). Deviations
+    # from the baseline path evolve on (y[t], y[t-1], g[t-1]) with no constant.
+    _, coef = coefs
+    a0, a1, b1, b2, a4 = coef
+    D = np.array([[b1, b2, a4], [1., 0., 0.], [0., 0., 0.]])
+    impact = {'Exchange Rate Growth': np.array([a0, 0., 0.]),
+              'Global Inflation': np.array([a1, 0., 1.])}
+    P = _powers(D, np.arange(horizon + 1))[:, 0, :]    # (horizon + 1, 3)
+    out = {}
+    for shock in SHOCKS:
+        response = P @ impact[shock]
+        # A permanent shock is a one-off shock repeated every month
+        out[shock] = np.cumsum(response) if permanent else response
+    return out
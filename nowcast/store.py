@@ -0,0 +1,57 @@
+# nowcast/store.py
+#
+# Server-side forecast store. Forecasts are saved under their scenario hash
+# (see nowcast.cache.scenario_key) as small JSON files, with an in-memory LRU
+# in front, so every session, tab and process on the node can reuse them.
+
+import json
+import os
+
+import pandas as pd
+
+from nowcast.cache import CACHE_DIR, ResultCache, write_atomic
+from nowcast.metrics import REGISTRY
+
+STORE_DIR = os.path.join(CACHE_DIR, 'forecasts')
+
+class ForecastStore:
+    def __init__(self, root=STORE_DIR, maxsize=1000):
+        self.root = root
+        self._mem = ResultCache(maxsize)
+        os.makedirs(root, exist_ok=True)
+
+    def __len__(self):
+        return len(self._mem)  # entries held in memory
+
+    def _path(self, key):
+        return os.path.join(self.root, f'{key}.json')
+
+    def get(self, key):
+        # Keys come from URLs, so anything that is not a plain hash is a miss
+        if not key or not key.isalnum():
+            return None
+        entry = self._mem.get(key)
+        if entry is None and os.path.exists(self._path(key)):
+            with open(self._path(key)) as f:
+                payload = json.load(f)
+            entry = {
+                'df_fc': pd.DataFrame({'Year': pd.to_datetime(payload['dates']),
+                                       'Inflation': payload['inflation']}),
+                'exrg': payload['exrg'],
+                'gi': payload['gi'],
+            }
+            self._mem.put(key, entry)
+        REGISTRY.cache_result('forecast_store', hit=entry is not None)
+        return entry
+
+    def put(self, key, df_fc, exrg, gi):
+        entry = {'df_fc': df_fc, 'exrg': exrg, 'gi': gi}
+        payload = {
+            'dates': [d.isoformat() for d in df_fc['Year']],
+            'inflation': [float(v) for v in df_fc['Inflation']],
+            'exrg': exrg,
+            'gi': gi,
+        }
+        write_atomic(self._path(key), lambda f: json.dump(payload, f))
+        self._mem.put(key, entry)
+        return entry
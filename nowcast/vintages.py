@@ -0,0 +1,136 @@
+# nowcast/vintages.py
+#
+# Vintage mode: the app's model as it would have been fitted at the end of
+# every past month, so the nowcast of any as-of date can be replayed without
+# editing the data and refitting.
+#
+# StandardScaler + Ridge only depends on the data through n, the column sums
+# and the cross products X'X, X'y, so each vintage keeps those sufficient
+# statistics and the next one adds a single month to them. The ridge is then
+# solved exactly in closed form on the standardized features (population
+# variance, as StandardScaler) and folded like model.linear_coefficients.
+#
+# The store (.cache/vintages/vintages.parquet) holds one row per as-of month:
+# statistics, folded coefficients and starting lags. Each row also carries a
+# hash chained over the training rows so far; when the feature store changes
+# only the vintages after the first changed month are recomputed. There are no
+# data revisions here: every vintage sees the current figures up to its month.
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from nowcast import model as nc_model
+from nowcast.cache import CACHE_DIR, write_atomic
+from nowcast.metrics import timed
+
+STORE_PATH = os.path.join(CACHE_DIR, 'vintages', 'vintages.parquet')
+MIN_MONTHS = 36  # first vintage once three years of training rows exist
+
+# ------------------------------------------------------------------------------
+# Closed-form ridge from sufficient statistics
+# ------------------------------------------------------------------------------
+def solve(n, sx, sy, sxx, sxy, shift_x, shift_y, alpha=nc_model.ALPHA):
+    # Statistics are over shifted data (x - shift_x, y - shift_y), which keeps
+    # the centered moments accurate. Returns (intercept, coef) on raw features.
+    mx, my = sx / n, sy / n
+    cov = sxx / n - np.outer(mx, mx)
+    cxy = sxy / n - mx * my
+    scale = np.sqrt(np.diag(cov))
+    scale[scale == 0] = 1.0
+    w = np.linalg.solve(n * cov / np.outer(scale, scale) + alpha * np.eye(len(sx)), n * cxy / scale)
+    coef = w / scale
+    intercept = float(my + shift_y - np.dot(coef, mx + shift_x))
+    return intercept, coef
+
+def _row_hashes(df_hist):
+    cols = ['Year', nc_model.TARGET, *nc_model.FEATURES]
+    return pd.util.hash_pandas_object(df_hist[cols], index=False).to_numpy()
+
+def _chain(previous, row_hash):
+    return hashlib.sha1(f'{previous}:{row_hash}'.encode()).hexdigest()
+
+# ------------------------------------------------------------------------------
+# Build / extend the store
+# ------------------------------------------------------------------------------
+@timed('build_vintages', 'model')
+def build(df_hist, stored=None, min_months=MIN_MONTHS):
+    # Vintages for every month of df_hist (the training frame). stored: an
+    # earlier build; its rows are reused up to the first changed month.
+    X = df_hist[nc_model.FEATURES].to_numpy(dtype=float)
+    y = df_hist[nc_model.TARGET].to_numpy(dtype=float)
+    p = X.shape[1]
+    shift_x, shift_y = X[0], y[0]
+    chains, chain = [], ''
+    for h in _row_hashes(df_hist):
+        chain = _chain(chain, h)
+        chains.append(chain)
+
+    # Longest stored prefix that still matches; resume from its statistics
+    reuse = 0
+    if stored is not None:
+        for stored_chain, chain in zip(stored['chain'], chains[min_months - 1:]):
+            if stored_chain != chain:
+                break
+            reuse += 1
+    if reuse:
+        last = stored.iloc[reuse - 1]
+        n, sx, sy = int(last['n']), np.asarray(last['sx']), float(last['sy'])
+        sxx, sxy = np.asarray(last['sxx']).reshape(p, p), np.asarray(last['sxy'])
+    else:
+        n, sx, sy, sxx, sxy = 0, np.zeros(p), 0.0, np.zeros((p, p)), np.zeros(p)
+
+    rows = []
+    for i in range(n, len(df_hist)):
+        # One month more: rank-one update of the statistics
+        xi, yi = X[i] - shift_x, y[i] - shift_y
+        n, sx, sy = n + 1, sx + xi, sy + yi
+        sxx, sxy = sxx + np.outer(xi, xi), sxy + xi * yi
+        if n < min_months:
+            continue
+        intercept, coef = solve(n, sx, sy, sxx, sxy, shift_x, shift_y)
+        rows.append({
+            'as_of': df_hist['Year'].iloc[i], 'n': n, 'chain': chains[i],
+            'intercept': intercept, 'coef': coef.tolist(),
+            'state': list(nc_model.initial_state(df_hist.iloc[:i + 1])),
+            'sx': sx.tolist(), 'sy': float(sy), 'sxx': sxx.ravel().tolist(), 'sxy': sxy.tolist(),
+        })
+    new = pd.DataFrame(rows, columns=['as_of', 'n', 'chain', 'intercept', 'coef', 'state',
+                                      'sx', 'sy', 'sxx', 'sxy'])
+    if not reuse:
+        return new
+    return pd.concat([stored.iloc[:reuse], new], ignore_index=True)
+
+def load_or_build(df_hist, path=STORE_PATH):
+    # Stored vintages, extended (or partly rebuilt) when the training frame changed
+    stored = pd.read_parquet(path) if os.path.exists(path) else None
+    vintages = build(df_hist, stored)
+    if stored is None or len(stored) != len(vintages) or not stored['chain'].equals(vintages['chain']):
+        write_atomic(path, lambda f: vintages.to_parquet(f, index=False), 'wb')
+    return vintages
+
+# ------------------------------------------------------------------------------
+# Lookup and replay
+# ------------------------------------------------------------------------------
+def index(vintages):
+    # as_of -> vintage, for lookups from the app
+    return vintages.set_index('as_of').sort_index()
+
+def as_of(indexed, date):
+    # Latest vintage on or before date (KeyError before the first one)
+    pos = indexed.index.searchsorted(pd.Timestamp(date), side='right') - 1
+    if pos < 0:
+        raise KeyError(f"no vintage on or before {pd.Timestamp(date).date()}")
+    row = indexed.iloc[pos]
+    return {'as_of': indexed.index[pos], 'n': int(row['n']),
+            'coefs': (float(row['intercept']), np.asarray(row['coef'], dtype=float)),
+            'state': tuple(row['state'])}
+
+def forecast(vintage, exrg, gi, n_periods=nc_model.N_PERIODS):
+    # The nowcast that vintage would have produced, shaped like the page's df_fc
+    path = nc_model.forecast_batch(vintage['coefs'], vintage['state'], [exrg], [gi], n_periods)[0]
+    start = vintage['as_of'] + pd.DateOffset(months=1)
+    return pd.DataFrame({'Year': [start + pd.DateOffset(months=i) for i in range(n_periods)],
+                         'Inflation': path})
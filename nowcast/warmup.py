@@ -0,0 +1,90 @@
+# nowcast/warmup.py
+#
+# Start-up warm-up: fills the shared caches (data, feature store, model fit,
+# forecast context, the baseline forecast, the explorer frames and chart
+# specs and the ticker) so the first visitor after a deploy does not pay for
+# them. st.cache_resource entries are process-wide, so filling them from a
+# background thread serves every later session. Nothing here waits on the
+# network: commodity bars are fetched by the refresh thread it starts.
+#
+# Readiness is published three ways: metrics.REGISTRY (GET /ready on the
+# metrics port answers 503 until warm, 200 after), the nowcast_ready gauge
+# and a status file for file-based probes:
+#
+#   .cache/ready.json   {"ready": true, "steps": {...}, "errors": {...}, ...}
+
+import json
+import os
+import threading
+import time
+
+from nowcast import app, commodities, metrics
+from nowcast.cache import CACHE_DIR, write_atomic
+
+READY_PATH = os.path.join(CACHE_DIR, 'ready.json')
+
+# (name, callable, required): a failed optional step is reported but does not
+# keep the instance out of rotation
+STEPS = [
+    ('load_and_train', app.load_and_train, True),
+    ('history_aggregates', app.history_aggregates, True),
+    ('food_prices', app.food_prices, True),
+    ('contributions', app.contributions, True),
+    ('forecast_context', app.forecast_context, True),
+    ('model_zoo', app.model_zoo, True),
+    ('vintage_store', app.vintage_store, False),
+    ('baseline_forecast', lambda: app.compute_forecast(0.0, 0.0), True),
+    ('load_inflation', app.inflation, True),
+    ('inflation_aggregates', app.inflation_aggregates, True),
+    ('load_sub_imp_nir', app.sub_imp_nir, True),
+    ('commodity_refresh', commodities.start_refresh, False),
+    ('commodity_snapshot', app.commodity_snapshot, False),
+    ('explorer_specs', lambda: [app.explorer_spec(choice, annotate)
+                                for choice in ('Inflation', 'Subsidies & Imports & Reserves/Import Ratio')
+                                for annotate in (False, True)], True),
+    ('ticker_spec', app.ticker_spec, False),
+    ('series_catalog', app.series_catalog, True),
+    ('flag_grid', app.flag_grid, True),
+]
+
+_lock = threading.Lock()
+_thread = None
+
+def _publish(status, path):
+    metrics.REGISTRY.set_readiness(status)
+    write_atomic(path, lambda f: json.dump(status, f, indent=2))
+
+def warm(path=READY_PATH, skip=()):
+    # skip: step names left out (the benchmarks skip the refresh thread)
+    status = {'ready': False, 'started': time.time(), 'finished': None, 'steps': {}, 'errors': {}}
+    _publish(status, path)
+    failed_required = False
+    for name, fn, required in STEPS:
+        if name in skip:
+            continue
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            status['errors'][name] = f"{type(e).__name__}: {e}"
+            failed_required = failed_required or required
+        status['steps'][name] = round(time.perf_counter() - start, 4)
+        metrics.REGISTRY.observe('warmup', name, status['steps'][name])
+        _publish(status, path)
+    status['ready'] = not failed_required
+    status['finished'] = time.time()
+    _publish(status, path)
+    return status
+
+def start(path=READY_PATH):
+    # Idempotent: one warm-up per process (none if already warmed with --wait)
+    global _thread
+    with _lock:
+        if _thread is None and not status()['ready']:
+            _thread = threading.Thread(target=warm, args=(path,), name='cache-warmup', daemon=True)
+            _thread.start()
+    return _thread
+
+def status():
+    with metrics.REGISTRY._lock:
+        return dict(metrics.REGISTRY.readiness)
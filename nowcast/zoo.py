@@ -0,0 +1,198 @@
+# nowcast/zoo.py
+#
+# Model zoo: several linear specifications of Egypt food inflation, stored as
+# coefficient artifacts and forecast together. Every
+# model is folded to an intercept plus weights on a shared set of candidate
+# features (zeros where a model does not use one), so all of them advance
+# through the 12-month recursion in one numpy pass.
+#
+# Ensemble weights are inverse squared RMSE over the last HOLDOUT months of
+# a fit that excluded them; the stored coefficients are then refitted on the
+# full history. Artifacts live in .cache/models/zoo.json and are reused while
+# the feature store version and the specifications are unchanged.
+#
+# The fits are small (a few ridge / OLS fits on ~170 rows), so the app fits
+# in-process: a pool would cost more to start than the work, and forking
+# from the Streamlit server's warm-up thread can deadlock a child. The CLI
+# can fit in a worker pool started through a forkserver:
+#
+#   python -m nowcast.zoo                # refit the artifact in-process
+#   python -m nowcast.zoo --workers 6    # one worker per model
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.linear_model import ElasticNet, LinearRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from nowcast import data, features, model as nc_model
+from nowcast.cache import CACHE_DIR, write_atomic
+from nowcast.metrics import timed
+
+ARTIFACT_PATH = os.path.join(CACHE_DIR, 'models', 'zoo.json')
+HOLDOUT = 24
+
+# Candidate features, in the order of the folded coefficient matrix
+CANDIDATES = [
+    'Exchange Rate Growth', 'Global Inflation',
+    'Egypt Inflation Lag1', 'Egypt Inflation Lag2',
+    'Global Inflation Lag1', 'Global Inflation Lag2',
+    'Exchange Rate Growth Lag1', 'Exchange Rate Growth Lag2',
+]
+
+# name -> (label, features, estimator factory)
+SPECS = {
+    'ridge': ("Ridge (app model)", nc_model.FEATURES,
+              lambda: Ridge(alpha=0.001, random_state=42)),
+    'ridge_lag1': ("Ridge, one lag", ['Exchange Rate Growth', 'Global Inflation',
+                                      'Egypt Inflation Lag1', 'Global Inflation Lag1'],
+                   lambda: Ridge(alpha=0.001, random_state=42)),
+    'ridge_full': ("Ridge, all lags", CANDIDATES,
+                   lambda: Ridge(alpha=1.0, random_state=42)),
+    'elasticnet': ("ElasticNet, all lags", CANDIDATES,
+                   lambda: ElasticNet(alpha=0.1, l1_ratio=0.5, max_iter=10000, random_state=42)),
+    'ar2': ("AR(2) baseline", ['Egypt Inflation Lag1', 'Egypt Inflation Lag2'],
+            LinearRegression),
+    'passthrough': ("Exchange-rate pass-through", ['Exchange Rate Growth', 'Exchange Rate Growth Lag1',
+                                                   'Exchange Rate Growth Lag2', 'Egypt Inflation Lag1'],
+                    LinearRegression),
+}
+
+def specs_version():
+    # Changes with any model's features or estimator settings, the candidate
+    # order or the holdout, so a stored artifact is never reused across them
+    payload = [CANDIDATES, HOLDOUT] + [
+        [name, feats, type(factory()).__name__, factory().get_params()]
+        for name, (_, feats, factory) in SPECS.items()]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+# ------------------------------------------------------------------------------
+# Fitting (in-process, or one worker per model)
+# ------------------------------------------------------------------------------
+def _fit(name, X, y):
+    # X: (rows, len(features)) in the spec's feature order
+    _, feats, factory = SPECS[name]
+    pipe = Pipeline([('scaler', StandardScaler()), ('est', factory())]).fit(X, y)
+    scaler, est = pipe.named_steps['scaler'], pipe.named_steps['est']
+    coef = est.coef_ / scaler.scale_
+    intercept = float(est.intercept_ - np.dot(coef, scaler.mean_))
+    full = np.zeros(len(CANDIDATES))
+    full[[CANDIDATES.index(f) for f in feats]] = coef
+    return intercept, full
+
+def _fit_with_holdout(name, X, y, holdout):
+    # Holdout RMSE of a fit without the last `holdout` rows, then the full fit
+    _, feats, _ = SPECS[name]
+    cols = [CANDIDATES.index(f) for f in feats]
+    intercept, coef = _fit(name, X[:-holdout, cols], y[:-holdout])
+    resid = y[-holdout:] - (intercept + X[-holdout:] @ coef)
+    intercept, coef = _fit(name, X[:, cols], y)
+    return {'name': name, 'intercept': intercept, 'coef': coef.tolist(),
+            'holdout_rmse': float(np.sqrt(np.mean(resid ** 2)))}
+
+@timed('train_zoo', 'model')
+def train(df_hist, workers=1, holdout=HOLDOUT):
+    # workers > 1: a forkserver pool (CLI and benchmarks only, never the app)
+    X = df_hist[CANDIDATES].to_numpy(dtype=float)
+    y = df_hist[nc_model.TARGET].to_numpy(dtype=float)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('forkserver')) as pool:
+            fitted = list(pool.map(_fit_with_holdout, SPECS, [X] * len(SPECS),
+                                   [y] * len(SPECS), [holdout] * len(SPECS)))
+    else:
+        fitted = [_fit_with_holdout(name, X, y, holdout) for name in SPECS]
+    inv = np.array([1.0 / max(m['holdout_rmse'], 1e-9) ** 2 for m in fitted])
+    for m, w in zip(fitted, inv / inv.sum()):
+        m['weight'] = float(w)
+        m['label'] = SPECS[m['name']][0]
+    return {'candidates': CANDIDATES, 'holdout': holdout, 'models': fitted}
+
+# ------------------------------------------------------------------------------
+# Artifacts
+# ------------------------------------------------------------------------------
+def load_or_train(df_hist, path=ARTIFACT_PATH, workers=1, version=None):
+    # Reuse the stored coefficients while the feature store and the specs are
+    # unchanged. version: the feature-store version df_hist was read from
+    # (default: current)
+    version = version or features.ensure()['version']
+    specs = specs_version()
+    if os.path.exists(path):
+        with open(path) as f:
+            zoo = json.load(f)
+        if zoo.get('features_version') == version and zoo.get('specs_version') == specs:
+            return zoo
+    zoo = dict(train(df_hist, workers), features_version=version, specs_version=specs)
+    write_atomic(path, lambda f: json.dump(zoo, f, indent=2))
+    return zoo
+
+# ------------------------------------------------------------------------------
+# Joint recursive forecast
+# ------------------------------------------------------------------------------
+def initial_state(df_hist):
+    # Last two observations of every raw series
+    last, prev = df_hist.iloc[-1], df_hist.iloc[-2]
+    return {name: (float(last[name]), float(prev[name])) for name in features.RAW_SERIES}
+
+@timed('forecast_zoo', 'model')
+def forecast(zoo, state, exrg, gi, n_periods=nc_model.N_PERIODS):
+    # exrg / gi as in model.forecast_batch. Returns (n_models, n_scenarios, n_periods).
+    intercepts = np.array([m['intercept'] for m in zoo['models']])
+    C = np.array([m['coef'] for m in zoo['models']])            # (models, candidates)
+    exrg = np.asarray(exrg, dtype=float)
+    gi = np.asarray(gi, dtype=float)
+    if exrg.ndim == 1:
+        exrg = np.repeat(exrg[:, None], n_periods, axis=1)
+    if gi.ndim == 1:
+        gi = np.repeat(gi[:, None], n_periods, axis=1)
+    n, m = exrg.shape[0], len(intercepts)
+
+    ei_lag1 = np.full((m, n), state['Egypt Inflation'][0])
+    ei_lag2 = np.full((m, n), state['Egypt Inflation'][1])
+    gi_lag1 = np.full(n, state['Global Inflation'][0])
+    gi_lag2 = np.full(n, state['Global Inflation'][1])
+    er_lag1 = np.full(n, state['Exchange Rate Growth'][0])
+    er_lag2 = np.full(n, state['Exchange Rate Growth'][1])
+    out = np.empty((m, n, n_periods))
+    for i in range(n_periods):
+        # Shared regressors (n,) enter through an outer product, own lags (m, n) elementwise
+        shared = np.stack([exrg[:, i], gi[:, i], gi_lag1, gi_lag2, er_lag1, er_lag2])
+        pred = (intercepts[:, None]
+                + C[:, [0, 1, 4, 5, 6, 7]] @ shared
+                + C[:, 2:3] * ei_lag1 + C[:, 3:4] * ei_lag2)
+        out[:, :, i] = pred
+        ei_lag2, ei_lag1 = ei_lag1, pred
+        gi_lag2, gi_lag1 = gi_lag1, gi[:, i]
+        er_lag2, er_lag1 = er_lag1, exrg[:, i]
+    return out
+
+def ensemble(zoo, paths):
+    # Weighted average over the model axis of forecast()'s output
+    weights = np.array([m['weight'] for m in zoo['models']])
+    return np.tensordot(weights, paths, axes=1)
+
+# ------------------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refit the model zoo and store its artifact.")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes (1: in-process)")
+    parser.add_argument('--path', default=ARTIFACT_PATH)
+    args = parser.parse_args(argv)
+
+    version = features.ensure()['version']
+    zoo = dict(train(data.load_training_frame(version), args.workers),
+               features_version=version, specs_version=specs_version())
+    write_atomic(args.path, lambda f: json.dump(zoo, f, indent=2))
+    for m in zoo['models']:
+        print(f"{m['name']:<12} holdout RMSE {m['holdout_rmse']:.3f}  weight {m['weight']:.3f}")
+    print(f"-> {args.path}")
+
+if __name__ == '__main__':
+    main()
@@ -3,11 +3,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model  import Ridge
-import time 
+import json
+
+from nowcast import app, charts, model as nc_model
 
 # ------------------------------------------------------------------------------ 
 # Button styling: colored backgrounds, shading, no-wrap 
@@ -30,39 +28,17 @@ st.markdown("""
 </style> 
 """, unsafe_allow_html=True)
 
+app.begin_rerun('Nowcasting Food Bill')
+
 # -------------------------------------------------------------------------- 
-# Country check (must be Egypt) 
+# Access check: logged in, country must be Egypt 
 # -------------------------------------------------------------------------- 
-if 'country' not in st.session_state or st.session_state['country'] != "Egypt": 
-    st.info("Forecasting is only available for Egypt.") 
-    st.stop() 
+app.require_access()
 
 # -------------------------------------------------------------------------- 
 # 1. Load & train the model 
 # -------------------------------------------------------------------------- 
-@st.cache_resource(show_spinner=False) 
-def load_and_train(): 
-    df = pd.read_excel('Python Data New - Interface -newJune11.xlsx') 
-    df['Year'] = pd.to_datetime(df['Year'], dayfirst=True) 
-    df = df.sort_values('Year').dropna(subset=[ 
-        'Exchange Rate Growth','Global Inflation', 
-        'Egypt Inflation Lag1','Egypt Inflation Lag2', 
-        'Global Inflation Lag1','Global Inflation Lag2', 
-        'Egypt Inflation' 
-    ]) 
-    features = [ 
-        'Exchange Rate Growth','Global Inflation', 
-        'Egypt Inflation Lag1','Egypt Inflation Lag2', 
-        'Global Inflation Lag1' 
-    ] 
-    model = Pipeline([ 
-        ('scaler', StandardScaler()), 
-        ('ridge', Ridge(alpha=0.001, random_state=42)) 
-    ]) 
-    model.fit(df[features], df['Egypt Inflation']) 
-    return model, df
-
-model, df_hist = load_and_train()
+model, df_hist = app.load_and_train()
 
 # -------------------------------------------------------------------------- 
 # 2. Page title 
@@ -75,59 +51,38 @@ st.title("Nowcasting Food Bill — Egypt")
 st.sidebar.header("Forecast Configuration") 
 
 # Only one fixed value: 12 months forecast 
-n_periods = 12  # Fixed to 12 months
+n_periods = nc_model.N_PERIODS  # Fixed to 12 months
 
 # Set the start date to be 1 month after the last historical entry
-last = df_hist.iloc[-1] 
-start_date = last['Year'] + pd.DateOffset(months=1) 
-forecast_dates = [start_date + pd.DateOffset(months=i) for i in range(n_periods)]
-
-# Store forecast_dates in session state for use in other tabs
-st.session_state['forecast_dates'] = forecast_dates
-st.session_state['start_date'] = start_date
+forecast_dates = nc_model.forecast_dates(df_hist, n_periods)
+start_date = forecast_dates[0]
 
 # User inputs for Exchange Rate Growth and Global Inflation (for the full 12 months)
+# A shared link (?scenario=...&exrg=...&gi=...) pre-fills the inputs
 st.sidebar.subheader("Exchange Rate Growth") 
-exrg_input = st.sidebar.number_input("Enter Exchange Rate Growth (%) for 12 months", value=0.0)
+exrg_input = st.sidebar.number_input("Enter Exchange Rate Growth (%) for 12 months", value=app.query_float('exrg'))
 
 st.sidebar.subheader("Global Inflation") 
-gi_input = st.sidebar.number_input("Enter Global Inflation (%) for 12 months", value=0.0)
+gi_input = st.sidebar.number_input("Enter Global Inflation (%) for 12 months", value=app.query_float('gi'))
 
 # "Run Forecast" button to trigger forecast computation
 if 'run_forecast' not in st.session_state: 
-    st.session_state['run_forecast'] = False 
+    st.session_state['run_forecast'] = 'scenario' in st.query_params 
 if st.sidebar.button("Run Forecast"): 
     st.session_state['run_forecast'] = True 
 
 if not st.session_state['run_forecast']: 
     st.info("Fill inputs on the left and click **Run Forecast**.") 
-    st.stop()
+    app.stop()
 
 # -------------------------------------------------------------------------- 
 # 4. Perform forecasting loop 
 # -------------------------------------------------------------------------- 
-ei_lag1 = last['Egypt Inflation'] 
-ei_lag2 = last['Egypt Inflation Lag1'] 
-gi_lag1 = last['Global Inflation'] 
-
-forecasts = [] 
-for i, dt in enumerate(forecast_dates): 
-    feat = { 
-        'Exchange Rate Growth': exrg_input,  # Now a fixed value for the 12 months
-        'Global Inflation': gi_input,  # Now a fixed value for the 12 months
-        'Egypt Inflation Lag1': ei_lag1, 
-        'Egypt Inflation Lag2': ei_lag2, 
-        'Global Inflation Lag1': gi_lag1 
-    } 
-    pred = model.predict(pd.DataFrame([feat]))[0] 
-    forecasts.append({'Year': dt, 'Inflation': pred}) 
-    ei_lag2, ei_lag1 = ei_lag1, pred 
-    gi_lag1 = gi_input  # Update lag with the same input value
-
-df_fc = pd.DataFrame(forecasts)
-
-# Store df_fc in session_state for later use in other pages
-st.session_state['df_fc'] = df_fc
+# Exchange Rate Growth and Global Inflation are held fixed for the 12 months
+# Forecasts live in the server-side store; the URL and session only keep the key
+scenario, entry = app.compute_forecast(exrg_input, gi_input)
+app.publish_scenario(scenario, exrg_input, gi_input)
+df_fc = entry['df_fc']
 
 # -------------------------------------------------------------------------- 
 # 5. View selector: two buttons in columns [1,3,8] 
@@ -151,104 +106,69 @@ view = st.session_state['view_choice']
 # --------------------------------------------------------------------------
 # 6. Charts based on selection (UPDATED)
 # --------------------------------------------------------------------------
+# Specs are cached per scenario (the key covers model, history and inputs)
 if view == 'Yearly average':
     st.subheader("Yearly Average Inflation: Historical vs Forecast")
-
-    # Historical averages
-    hist_avg = (
-        df_hist.assign(Year=df_hist['Year'].dt.year)
-               .groupby('Year', as_index=False)['Egypt Inflation']
-               .mean()
-               .rename(columns={'Egypt Inflation':'Inflation'})
-    )
-    hist_avg['Type'] = 'Historical'
-
-    # Forecast averages
-    fc_avg = (
-        df_fc.assign(Year=df_fc['Year'].dt.year)
-             .groupby('Year', as_index=False)['Inflation']
-             .mean()
-    )
-    fc_avg['Type'] = 'Forecast'
-
-    # Build a two-point segment so the forecast line connects to the last historical point
-    last_hist = hist_avg[hist_avg['Year'] == hist_avg['Year'].max()][['Year','Inflation']]
-    fc_segment = pd.concat([last_hist, fc_avg], ignore_index=True)
-
-    # Plot historical line
-    hist_line = alt.Chart(hist_avg).mark_line(strokeWidth=3).encode(
-        x=alt.X('Year:O', axis=alt.Axis(title='Year', labelAngle=0)),
-        y=alt.Y('Inflation:Q', axis=alt.Axis(title='Avg Inflation (%)')),
-        color=alt.value('steelblue')
-    )
-
-    # Plot forecast segment (dashed)
-    fc_line = alt.Chart(fc_segment).mark_line(strokeWidth=3, strokeDash=[4,4]).encode(
-        x='Year:O',
-        y='Inflation:Q',
-        color=alt.value('orange')
-    )
-
-    # Plot forecast points
-    fc_pts = alt.Chart(fc_avg).mark_point(size=100).encode(
-        x='Year:O',
-        y='Inflation:Q',
-        color=alt.value('orange')
-    )
-
-    # Combine and render
-    st.altair_chart((hist_line + fc_line + fc_pts)
-                    .properties(width=700, height=400),
-                    use_container_width=True)
+    spec = app.figure_spec('altair_yearly', scenario, (), lambda: charts.yearly_chart(
+        app.history_aggregates().yearly_mean('Egypt Inflation', 'Inflation'), df_fc).to_json())
+    st.vega_lite_chart(json.loads(spec), use_container_width=True)
 
 else:
     st.subheader("Monthly Inflation: Last Historical Year & Forecast")
+    spec = app.figure_spec('altair_monthly', scenario, (), lambda: charts.monthly_chart(
+        app.history_aggregates().last_year_monthly('Egypt Inflation', 'Inflation'), df_fc).to_json())
+    st.vega_lite_chart(json.loads(spec), use_container_width=True)
 
-    # Historical monthly for the last year
-    last_year = df_hist['Year'].dt.year.max()
-    hist_monthly = (
-        df_hist[df_hist['Year'].dt.year == last_year]
-               [['Year','Egypt Inflation']]
-               .rename(columns={'Egypt Inflation':'Inflation'})
-    )
-    hist_monthly['Type'] = 'Historical'
-
-    # Forecast monthly
-    fc_monthly = df_fc.copy()
-    fc_monthly['Type'] = 'Forecast'
-
-    # Build a two-point segment so the forecast line connects to the last historical month
-    last_month = hist_monthly.iloc[[-1]][['Year','Inflation']]
-    fc_segment_monthly = pd.concat(
-        [last_month, fc_monthly[['Year','Inflation']]],
-        ignore_index=True
-    )
-
-    # Plot historical line
-    hist_line_m = alt.Chart(hist_monthly).mark_line(strokeWidth=3).encode(
-        x=alt.X('yearmonth(Year):T', axis=alt.Axis(title='', format='%b %Y', labelAngle=0)),
-        y=alt.Y('Inflation:Q', axis=alt.Axis(title='Inflation Rate (%)')),
-        color=alt.value('steelblue')
-    )
-
-    # Plot forecast segment (dashed)
-    fc_line_m = alt.Chart(fc_segment_monthly).mark_line(strokeWidth=3, strokeDash=[4,4]).encode(
-        x=alt.X('yearmonth(Year):T'),
-        y='Inflation:Q',
-        color=alt.value('orange')
-    )
-
-    # Plot forecast points
-    fc_pts_m = alt.Chart(fc_monthly).mark_point(size=60).encode(
-        x=alt.X('yearmonth(Year):T'),
-        y='Inflation:Q',
-        color=alt.value('orange')
-    )
+# --------------------------------------------------------------------------
+# 6b. Model zoo: ensemble-weighted forecast and per-model comparison
+# (stored coefficients, all models in one vectorized pass; see nowcast/zoo.py).
+# Behind a checkbox: an expander's body runs on every rerun, even collapsed
+# --------------------------------------------------------------------------
+if st.checkbox("Compare models (ensemble)", key='show_zoo'):
+    zoo_models = app.model_zoo()['models']
+    zoo_paths, ensemble_path = app.zoo_forecast(exrg_input, gi_input)
+    st.dataframe(pd.DataFrame({
+        'Model': [m['label'] for m in zoo_models] + ['Ensemble'],
+        'Weight': [m['weight'] for m in zoo_models] + [1.0],
+        'Holdout RMSE': [m['holdout_rmse'] for m in zoo_models] + [np.nan],
+        'Avg forecast (%)': list(zoo_paths.mean(axis=1)) + [ensemble_path.mean()],
+    }).round(3), hide_index=True, use_container_width=True)
+
+    def build_zoo_chart():
+        labels = [m['label'] for m in zoo_models] + ['Ensemble']
+        values = np.vstack([zoo_paths, ensemble_path])
+        df_paths = pd.DataFrame({
+            'Year': list(df_fc['Year']) * len(labels),
+            'Model': np.repeat(labels, values.shape[1]),
+            'Inflation': values.ravel(),
+        })
+        return charts.zoo_chart(df_paths).to_json()
+    spec = app.figure_spec('altair_zoo', [scenario, app.model_zoo()['features_version']], (), build_zoo_chart)
+    st.vega_lite_chart(json.loads(spec), use_container_width=True)
 
-    # Combine and render
-    st.altair_chart((hist_line_m + fc_line_m + fc_pts_m)
-                    .properties(width=700, height=350),
-                    use_container_width=True)
+# --------------------------------------------------------------------------
+# 6c. Historical replay: the nowcast as the model stood at a past month
+# (as-of fits from the vintage store, no refitting; see nowcast/vintages.py),
+# behind a checkbox like the model comparison
+# --------------------------------------------------------------------------
+if st.checkbox("Historical replay (as of a past month)", key='show_vintage'):
+    vintage_index = app.vintage_store()
+    vintage_dates = list(vintage_index.index)
+    as_of_date = st.select_slider("As of", options=vintage_dates, value=vintage_dates[-1],
+                                  format_func=lambda d: d.strftime('%b %Y'), key='vintage_as_of')
+    vintage, df_vintage = app.vintage_forecast(as_of_date, exrg_input, gi_input)
+    st.caption(f"Model fitted on {vintage['n']} months up to {vintage['as_of']:%b %Y}, "
+               f"same scenario inputs as above.")
+
+    def build_vintage_chart():
+        _, df_hist = app.load_and_train()
+        window = df_hist[(df_hist['Year'] > vintage['as_of'] - pd.DateOffset(months=24))
+                         & (df_hist['Year'] <= df_vintage['Year'].iloc[-1])]
+        df_actual = window[['Year', 'Egypt Inflation']].rename(columns={'Egypt Inflation': 'Inflation'})
+        return charts.vintage_chart(df_actual, df_vintage, vintage['as_of']).to_json()
+    spec = app.figure_spec('altair_vintage', vintage_index['chain'].iloc[-1],
+                           (vintage['as_of'].isoformat(), exrg_input, gi_input), build_vintage_chart)
+    st.vega_lite_chart(json.loads(spec), use_container_width=True)
 
 # -------------------------------------------------------------------------- 
 # 7. Forecast Results Table 
@@ -259,3 +179,10 @@ with st.expander("Show Forecast Data"):
     st.table(table_df) 
     st.download_button("Download CSV", table_df.to_csv().encode(), 
                        file_name="inflation_forecasts.csv") 
+    # Forecast, food bill by item and category, NIR, subsidy path, contributions;
+    # the workbook is only built when the button is clicked
+    st.download_button("Download all results (Excel)",
+                       lambda: app.scenario_workbook(scenario, exrg_input, gi_input),
+                       file_name="nowcast_results.xlsx")
+
+app.end_rerun()
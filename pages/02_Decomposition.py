@@ -1,39 +1,26 @@
 # 8. Percentage Contributions
-import plotly.graph_objects as go
 import streamlit as st
-import pandas as pd
-import numpy as np
-import altair as alt
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model  import Ridge
-import time 
+import json
+
+from nowcast import app, charts
+
+app.begin_rerun('Decomposition')
+app.require_access()
 
 # --------------------------------------------------------------------------
 # 8. Percentage Contributions with interactive year selection and stacked bar chart
 # --------------------------------------------------------------------------
 st.subheader("Percentage Contributions")
 
-# Grab the forecast dataframe you computed earlier
-if 'df_fc' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first.")
-    st.stop()
-
-df_fc = st.session_state['df_fc']
-
-# Grab forecast_dates from session state
-if 'forecast_dates' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first to generate the forecast.")
-    st.stop()
+# Fetch the forecast for this scenario from the shared store (computed on demand)
+df_fc, exrg_input, gi_input, is_baseline = app.current_forecast()
+if is_baseline:
+    st.info("Showing the baseline scenario (0% exchange rate growth, 0% global inflation). "
+            "Run the Nowcasting Food Bill page to use your own inputs.")
 
-forecast_dates = st.session_state['forecast_dates']
-
-# Grab start_date from session state
-if 'start_date' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first to generate the forecast.")
-    st.stop()
-
-start_date = st.session_state['start_date']
+# Forecast months straight from the shared frame (no per-session copies)
+forecast_dates = df_fc['Year']
+start_date = forecast_dates.iloc[0]
 
 # Now you can safely use forecast_dates in your code
 
@@ -48,9 +35,8 @@ with st.expander("Show Forecast Data"):
 
 # --------------------------------------------------------------------------
 
-# Load the full dataset for contributions
-xlsx_path = "StackedBar - Copy.xlsx"
-contrib_full_df = pd.read_excel(xlsx_path)
+# Load the full dataset for contributions (cached, shared by all sessions)
+contrib_full_df = app.contributions()
 
 # Year selection dropdown
 selected_year = st.selectbox(
@@ -60,119 +46,10 @@ selected_year = st.selectbox(
 
 # Filter dataset for selected year
 row = contrib_full_df[contrib_full_df['Year'].astype(str) == selected_year].iloc[0]
-year_label = str(int(row["Year"]))
-
-# Define desired legend order
-desired_order = [
-    "World Food Price (increase)",
-    "World Food Price (decrease)",
-    "Exchange Rate (depreciation)",
-    "Exchange Rate (appreciation)",
-    "Other Factors",
-    "Unexplained (residuals)"
-]
 
-# Extract values in that order
-cats = []
-vals = []
-for cat in desired_order:
-    if cat in row.index:
-        cats.append(cat)
-        vals.append(float(row[cat]))
-
-# Split into negative and positive preserving order
-neg_data = []
-pos_data = []
-for cat, val in zip(cats, vals):
-    if val < 0:
-        neg_data.append((cat, val))
-    else:
-        pos_data.append((cat, val))
-
-# Define colors
-color_map = {
-    "World Food Price (increase)": "#1F3B73",
-    "World Food Price (decrease)": "#8B0000",
-    "Exchange Rate (depreciation)": "#89CFF0",
-    "Exchange Rate (appreciation)": "#F08080",
-    "Other Factors": "#FFB347",
-    "Unexplained (residuals)": "#FF8C00"
-}
-
-# Build Plotly figure
-fig = go.Figure()
-
-neg_base = 0.0
-for cat, val in neg_data:
-    fig.add_trace(go.Bar(
-        y=[year_label],
-        x=[val],
-        name=cat,
-        orientation='h',
-        marker=dict(color=color_map[cat]),
-        base=[neg_base],
-        customdata=[val],
-        hovertemplate=f"<b>{cat}</b><br>Value: %{{customdata}}<extra></extra>"
-    ))
-    neg_base += val
-
-pos_base = 0.0
-for cat, val in pos_data:
-    fig.add_trace(go.Bar(
-        y=[year_label],
-        x=[val],
-        name=cat,
-        orientation='h',
-        marker=dict(color=color_map[cat]),
-        base=[pos_base],
-        customdata=[val],
-        hovertemplate=f"<b>{cat}</b><br>Value: %{{customdata}}<extra></extra>"
-    ))
-    pos_base += val
-
-fig.update_layout(
-    title=dict(
-        text="Decomposition of Domestic Food Price Change in Egypt",
-        x=0.5, xanchor="center",
-        font=dict(size=16)
-    ),
-    barmode='relative',
-    template='plotly_white',
-    height=350,
-    margin=dict(l=40, r=40, t=60, b=80),
-    xaxis=dict(
-        title="",
-        showline=True,
-        linecolor="black",
-        linewidth=1,
-        zeroline=True,
-        zerolinewidth=2,
-        zerolinecolor="black",
-        showgrid=False,
-        tickmode='array',
-        tickvals=[-100, -80, -60, -40, -20, 0, 20, 40, 60, 80, 100, 120, 140, 160],
-        ticks="outside",
-        tickfont=dict(size=12)
-    ),
-    yaxis=dict(
-        title="",
-        tickmode='array',
-        tickvals=[year_label],
-        ticktext=[year_label],
-        ticks="",
-        showgrid=False,
-        showline=False
-    ),
-    legend=dict(
-        orientation="h",
-        y=-0.25,
-        x=0.5,
-        xanchor="center",
-        yanchor="top",
-        font=dict(size=12),
-        bgcolor="rgba(0,0,0,0)"
-    ),
-    showlegend=True
-)
+# Stacked horizontal bar in the desired legend order (see nowcast/charts.py)
+spec = app.figure_spec('plotly_decomposition', app.data_version('contributions'), (selected_year,),
+                       lambda: charts.decomposition_figure(row).to_json())
+st.plotly_chart(json.loads(spec), use_container_width=True)
 
-st.plotly_chart(fig, use_container_width=True)
+app.end_rerun()
@@ -1,39 +1,26 @@
 # 8. Percentage Contributions
-import plotly.graph_objects as go
 import streamlit as st
-import pandas as pd
-import numpy as np
-import altair as alt
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model  import Ridge
-import time 
+import json
+
+from nowcast import app, charts, food_bill
+
+app.begin_rerun('Food Prices')
+app.require_access()
 
 # --------------------------------------------------------------------------
 # 8. Percentage Contributions with interactive year selection and stacked bar chart
 # --------------------------------------------------------------------------
 st.subheader("Percentage Contributions")
 
-# Grab the forecast dataframe you computed earlier
-if 'df_fc' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first.")
-    st.stop()
-
-df_fc = st.session_state['df_fc']
-
-# Grab forecast_dates from session state
-if 'forecast_dates' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first to generate the forecast.")
-    st.stop()
+# Fetch the forecast for this scenario from the shared store (computed on demand)
+df_fc, exrg_input, gi_input, is_baseline = app.current_forecast()
+if is_baseline:
+    st.info("Showing the baseline scenario (0% exchange rate growth, 0% global inflation). "
+            "Run the Nowcasting Food Bill page to use your own inputs.")
 
-forecast_dates = st.session_state['forecast_dates']
-
-# Grab start_date from session state
-if 'start_date' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first to generate the forecast.")
-    st.stop()
-
-start_date = st.session_state['start_date']
+# Forecast months straight from the shared frame (no per-session copies)
+forecast_dates = df_fc['Year']
+start_date = forecast_dates.iloc[0]
 
 # Now you can safely use forecast_dates in your code
 
@@ -48,31 +35,26 @@ with st.expander("Show Forecast Data"):
 
 # --------------------------------------------------------------------------
 
-# Load the full dataset for contributions
-xlsx_path = "StackedBar - Copy.xlsx"
-contrib_full_df = pd.read_excel(xlsx_path)
-
 # --------------------------------------------------------------------------
 # 9. Food Price Adjustment based on Forecast Inflation
 # --------------------------------------------------------------------------
 # 9. Food Price Adjustment based on Forecast Inflation
 # --------------------------------------------------------------------------
 
-# Load the FoodPricesTest dataset (containing food names and prices)
-food_prices_df = pd.read_excel("FoodPricesTest.xlsx")
+# Load the FoodPricesTest dataset (containing food names and prices; cached, shared by all sessions)
+food_prices_df = app.food_prices()
 
 # Fetch the inflation rate for the forecasted months using the forecasted inflation values from df_fc
 # Calculate the average inflation for the forecast period
-inflation_rate = np.mean(df_fc['Inflation']) / 100  # Convert percentage to decimal
+avg_inflation = food_bill.average_inflation(df_fc)
+inflation_rate = avg_inflation / 100  # Convert percentage to decimal
 
 # Display the inflation rate to verify if the correct value is being used
 st.markdown(f"**Inflation Rate Used for Adjustment**: {inflation_rate * 100:.2f}%")
 
-# Adjust food prices based on the forecasted inflation
-food_prices_df['Adjusted Price'] = food_prices_df['Price'] * (1 + inflation_rate)
-
-# Calculate the total value (Adjusted Price * Quantity)
-food_prices_df['Total Value'] = food_prices_df['Adjusted Price'] * food_prices_df['Quantity']
+# Adjust food prices based on the forecasted inflation and calculate the
+# total value (Adjusted Price * Quantity)
+food_prices_df = food_bill.adjust_food_prices(food_prices_df, avg_inflation)
 food_prices_df2= food_prices_df
 # --------------------------------------------------------------------------
 # Interactive Category Filter
@@ -123,10 +105,10 @@ selected_year = st.selectbox(
 
 # If user selects Year 1, filter only first set of months (this could be year or remaining months)
 if selected_year.startswith("Year 1"):
-    adjusted_prices_for_year = food_prices_df.copy()
+    adjusted_prices_for_year = food_prices_df
     year_display = start_date.year  # Display the correct year
 elif selected_year.startswith("Year 2"):
-    adjusted_prices_for_year = food_prices_df.copy()
+    adjusted_prices_for_year = food_prices_df
     year_display = start_date.year + 1  # Display the second year for remaining months
 
 # Adjust the year displayed by subtracting 1 if forecast is under 12 months
@@ -139,27 +121,12 @@ if num_months <= 12:
 st.subheader(f"Adjusted Food Prices for Year {year_display}")
 
 # Create the horizontal bar chart for food prices (Total Value)
-fig = go.Figure()
-
-fig.add_trace(go.Bar(
-    y=adjusted_prices_for_year['Food Name'],
-    x=adjusted_prices_for_year['Total Value'],
-    orientation='h',
-    marker=dict(color='#FF8C00'),
-    hovertemplate="<b>%{y}</b><br>Total Value:%{x:,.0f}<extra></extra>"
-))
-
-# Update layout
-fig.update_layout(
-    title=f"Import Bill adjusted for inflation by category: {year_display} -Forecasted",
-    xaxis=dict(title=""),
-    yaxis=dict(title=""),
-    showlegend=False,
-    template='plotly_white',
-    height=500
-)
+# (cached per scenario, food basket version, category and year)
+spec = app.figure_spec('plotly_food_prices', [st.session_state['scenario'], app.data_version('food_prices')],
+                       (selected_category, year_display),
+                       lambda: charts.food_prices_figure(adjusted_prices_for_year, year_display).to_json())
 
-st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(json.loads(spec), use_container_width=True)
 
 
 # 10. Summarize and Calculate NIR for 2025 (Total value based on all data)
@@ -170,20 +137,9 @@ st.plotly_chart(fig, use_container_width=True)
 # Calculate the total price of all food items (using all the data, regardless of category)
 total_value_all_food = food_prices_df2['Total Value'].sum()
 
-# Subtract 16,046,071,327 from the total value
-adjusted_value = total_value_all_food - 16046071327
-
-# Divide by 1000 (to convert from billions to millions)
-adjusted_value_in_millions = adjusted_value / 1000000
-
-# Add 72,134 to the result
-adjusted_value_plus_addition = adjusted_value_in_millions + 72134
-
-# Divide by 12 (to get the monthly value)
-monthly_value = adjusted_value_plus_addition / 12
-
-# Finally, divide by 46,385 (to get the NIR)
-nir_2025 = 46385 / monthly_value
+# Subtract the non-food offset, convert to millions, add other imports,
+# take the monthly value and divide reserves by it (the NIR)
+nir_2025 = food_bill.nir_cover(total_value_all_food)
 
 # Format the values to make them stand out (in billions for simplicity)
 total_value_all_food_formatted = f"${total_value_all_food / 1e9:.2f} Billion"
@@ -217,4 +173,6 @@ st.markdown(f"""
 
 # --------------------------------------------------------------------------
 # --------------------------------------------------------------------------
-# --------------------------------------------------------------------------
\ No newline at end of file
+# --------------------------------------------------------------------------
+
+app.end_rerun()
@@ -1,39 +1,26 @@
 # 8. Percentage Contributions
-import plotly.graph_objects as go
 import streamlit as st
-import pandas as pd
-import numpy as np
-import altair as alt
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model  import Ridge
-import time 
+import json
+
+from nowcast import app, charts, food_bill
+
+app.begin_rerun('Subsidies')
+app.require_access()
 
 # --------------------------------------------------------------------------
 # 8. Percentage Contributions with interactive year selection and stacked bar chart
 # --------------------------------------------------------------------------
 st.subheader("Percentage Contributions")
 
-# Grab the forecast dataframe you computed earlier
-if 'df_fc' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first.")
-    st.stop()
-
-df_fc = st.session_state['df_fc']
-
-# Grab forecast_dates from session state
-if 'forecast_dates' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first to generate the forecast.")
-    st.stop()
+# Fetch the forecast for this scenario from the shared store (computed on demand)
+df_fc, exrg_input, gi_input, is_baseline = app.current_forecast()
+if is_baseline:
+    st.info("Showing the baseline scenario (0% exchange rate growth, 0% global inflation). "
+            "Run the Nowcasting Food Bill page to use your own inputs.")
 
-forecast_dates = st.session_state['forecast_dates']
-
-# Grab start_date from session state
-if 'start_date' not in st.session_state:
-    st.error("You need to run the Nowcasting Food Bill Page first to generate the forecast.")
-    st.stop()
-
-start_date = st.session_state['start_date']
+# Forecast months straight from the shared frame (no per-session copies)
+forecast_dates = df_fc['Year']
+start_date = forecast_dates.iloc[0]
 
 # Now you can safely use forecast_dates in your code
 
@@ -48,9 +35,6 @@ with st.expander("Show Forecast Data"):
 
 # --------------------------------------------------------------------------
 
-# Load the full dataset for contributions
-xlsx_path = "StackedBar - Copy.xlsx"
-contrib_full_df = pd.read_excel(xlsx_path)
 
 
 # 11. Subsidy Calculation Based on Inflation Average
@@ -61,13 +45,10 @@ contrib_full_df = pd.read_excel(xlsx_path)
 # --------------------------------------------------------------------------
 
 # Calculate the average inflation from the forecasted values
-avg_inflation = np.mean(df_fc['Inflation'])
+avg_inflation = food_bill.average_inflation(df_fc)
 
-# Apply the multiplier to adjust the value based on inflation
-adjusted_value = 117.675118055328 * (1 + avg_inflation / 100)
-
-# Calculate the subsidy
-subsidy = (adjusted_value * 133278000000) / 117.675118055328
+# Apply the multiplier to adjust the value based on inflation and calculate the subsidy
+subsidy = food_bill.subsidy_value(avg_inflation)
 
 # Display the subsidy in a formatted way
 st.subheader("Subsidy Responsiveness")
@@ -81,37 +62,12 @@ st.markdown(f"**Subsidy Value:** {subsidy_formatted}")
 # 11. Visualization - Bar Graph to Show Subsidy Value and Reference Value
 # --------------------------------------------------------------------------
 
-# Prepare data for the bar graph (Subsidy value and Reference value of 140B)
-subsidy_data = pd.DataFrame({
-    "Category": ["Subsidy Value", "Reference Value (140B)"],
-    "Amount": [subsidy / 1e9, 140]  # Divide subsidy by 1e9 to convert to billions
-})
-
-# Create a horizontal bar chart to visualize the subsidy value alongside the reference value
-import plotly.express as px
-
-fig = px.bar(subsidy_data, x="Amount", y="Category", 
-             title="Subsidy Calculation Visualization", 
-             labels={"Amount": "Amount (in billions EGP)"}, 
-             orientation='h',  # Set orientation to horizontal
-             color="Category",  # Color by category
-             color_discrete_map={"Subsidy Value": "#FF8C00",  # Orange for Subsidy
-                                 "Reference Value (140B)": "#D3D3D3"})  # Light grey for Reference
-
-# Update the layout
-fig.update_layout(
-    xaxis_title="Amount (in billions EGP)",
-    yaxis_title="",
-    template='plotly_white',
-    height=400,
-    showlegend=False,  # Hide the legend
-    hoverlabel=dict(namelength=0)  # Removes the category name from the hover text
-)
-
-# Update hovertemplate to customize the hover text (convert to billions and display as B)
-fig.update_traces(
-    hovertemplate="Amount: %{x:,.2f}B EGP"  # Shows the amount in billions with "B" suffix and two decimal places
-)
+# Horizontal bar chart of the subsidy value alongside the 140B reference value
+# (cached per scenario)
+spec = app.figure_spec('plotly_subsidies', st.session_state['scenario'], (),
+                       lambda: charts.subsidy_figure(subsidy).to_json())
 
 # Show the bar chart
-st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+st.plotly_chart(json.loads(spec), use_container_width=True)
+
+app.end_rerun()
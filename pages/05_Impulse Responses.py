@@ -0,0 +1,79 @@
+# Impulse responses and long-horizon forecasts (state-space form of the model)
+import json
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from nowcast import app, charts, statespace
+from nowcast.cache import context_version
+
+app.begin_rerun('Impulse Responses')
+app.require_access()
+
+df_fc, exrg_input, gi_input, is_baseline = app.current_forecast()
+if is_baseline:
+    st.info("Showing the baseline scenario (0% exchange rate growth, 0% global inflation). "
+            "Run the Nowcasting Food Bill page to use your own inputs.")
+
+ctx = app.forecast_context()
+coefs = ctx['coefs']
+stab = statespace.stability(coefs)
+multipliers = statespace.long_run_multipliers(coefs)
+
+# --------------------------------------------------------------------------
+# 1. Dynamics of the model: stability, persistence, long-run pass-through
+# --------------------------------------------------------------------------
+st.subheader("Model Dynamics")
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Largest root (modulus)", f"{stab['radius']:.3f}")
+col2.metric("Half-life of a shock", f"{stab['half_life']:.1f} months" if stab['stable'] else "n/a")
+col3.metric("Long-run pass-through, exchange rate", f"{multipliers['Exchange Rate Growth']:.2f}"
+            if stab['stable'] else "n/a")
+col4.metric("Long-run pass-through, global inflation", f"{multipliers['Global Inflation']:.2f}"
+            if stab['stable'] else "n/a")
+if not stab['stable']:
+    st.warning("The fitted model is not stable: shocks do not die out and there is no long-run level.")
+
+# --------------------------------------------------------------------------
+# 2. Impulse responses to a one-point shock in each input
+# --------------------------------------------------------------------------
+st.subheader("Impulse Responses")
+shock_type = st.radio("Shock", ["One-off", "Permanent"], horizontal=True, key='irf_shock')
+irf_months = st.slider("Months", 12, 120, 60, step=12, key='irf_months')
+permanent = shock_type == "Permanent"
+
+def build_irf_chart():
+    responses = statespace.impulse_responses(coefs, irf_months, permanent)
+    df_irf = pd.DataFrame({
+        'Month': np.tile(np.arange(irf_months + 1), len(responses)),
+        'Shock': np.repeat(list(responses), irf_months + 1),
+        'Response': np.concatenate(list(responses.values())),
+    })
+    return charts.impulse_chart(df_irf).to_json()
+
+# Specs depend on the fitted model only, so every scenario shares them
+spec = app.figure_spec('altair_impulse', context_version(ctx), (irf_months, permanent), build_irf_chart)
+st.vega_lite_chart(json.loads(spec), use_container_width=True)
+st.caption("One-off: the input is one point higher for a single month. "
+           "Permanent: it stays one point higher from then on.")
+
+# --------------------------------------------------------------------------
+# 3. Long-horizon forecast for this scenario and its steady state
+# --------------------------------------------------------------------------
+st.subheader("Long-Horizon Forecast")
+years = st.slider("Years ahead", 1, 10, 5, key='horizon_years')
+if np.ndim(exrg_input) or np.ndim(gi_input):
+    # Monthly paths from the forecast service: hold the last month's inputs
+    exrg_input, gi_input = float(np.ravel(exrg_input)[-1]), float(np.ravel(gi_input)[-1])
+    st.caption("This scenario has monthly inputs; the long-horizon view holds the last month's values.")
+steady = float(statespace.steady_state(coefs, exrg_input, gi_input)) if stab['stable'] else None
+if steady is not None:
+    st.markdown(f"**Steady-state inflation:** {steady:.2f}% "
+                f"(exchange rate growth {exrg_input}%, global inflation {gi_input}%, held indefinitely)")
+
+spec = app.figure_spec('altair_long_horizon', st.session_state['scenario'], (years,), lambda: charts.long_horizon_chart(
+    app.long_horizon_forecast(exrg_input, gi_input, 12 * years), steady).to_json())
+st.vega_lite_chart(json.loads(spec), use_container_width=True)
+
+app.end_rerun()
@@ -0,0 +1,91 @@
+# pages/Diagnostics.py
+
+import os
+
+import streamlit as st
+import pandas as pd
+
+from nowcast import app, metrics, profiling, warmup
+
+# --------------------------------------------------------------------------
+# Admin only: behind the app-level password gate
+# --------------------------------------------------------------------------
+if not st.session_state.get('authenticated'):
+    st.info("Log in on the Data Exploration page first.")
+    st.stop()
+
+st.title("Diagnostics")
+st.caption("Process-wide figures since the server started (last 2048 samples per operation).")
+
+# --------------------------------------------------------------------------
+# 1. Timings: reruns, data loads, model fit/predict, chart builds, fetches
+# --------------------------------------------------------------------------
+st.subheader("Timings")
+timings = pd.DataFrame(metrics.REGISTRY.timing_rows())
+if timings.empty:
+    st.write("No samples yet.")
+else:
+    ms_cols = ['mean_s', 'p50_s', 'p95_s', 'p99_s']
+    timings[ms_cols] = timings[ms_cols] * 1000
+    timings = timings.rename(columns={c: c.replace('_s', ' (ms)') for c in ms_cols})
+    st.dataframe(timings.round(2), hide_index=True, use_container_width=True)
+
+# --------------------------------------------------------------------------
+# 2. Cache hit / miss rates
+# --------------------------------------------------------------------------
+st.subheader("Caches")
+caches = pd.DataFrame(metrics.REGISTRY.cache_rows())
+if caches.empty:
+    st.write("No cache lookups yet.")
+else:
+    st.dataframe(caches.round(3), hide_index=True, use_container_width=True)
+
+# --------------------------------------------------------------------------
+# 3. Per-session memory (session_state)
+# --------------------------------------------------------------------------
+st.subheader("Session memory")
+metrics.REGISTRY.sweep_sessions()  # idle sessions expire after metrics.SESSION_TTL
+sessions = pd.DataFrame(metrics.REGISTRY.session_rows(), columns=['session', 'bytes'])
+if sessions.empty:
+    st.write("No sessions sampled yet.")
+else:
+    sessions['MB'] = sessions['bytes'] / 1e6
+    st.metric("Sessions", len(sessions), f"{sessions['MB'].sum():.2f} MB total")
+    st.dataframe(sessions, hide_index=True, use_container_width=True)
+
+st.markdown("**This session, by key**")
+st.dataframe(app.session_memory_report(), hide_index=True, use_container_width=True)
+
+# --------------------------------------------------------------------------
+# 4. Prometheus export
+# --------------------------------------------------------------------------
+st.subheader("Prometheus export")
+text = metrics.render_prometheus()
+st.download_button("Download metrics.prom", text.encode(), file_name="metrics.prom")
+with st.expander("Show exposition text"):
+    st.code(text, language='text')
+
+# --------------------------------------------------------------------------
+# 5. Saved rerun profiles (add ?profile=1, or ?profile=mem, to any page URL)
+# --------------------------------------------------------------------------
+st.subheader("Rerun profiles")
+profiles = sorted(os.listdir(profiling.PROFILE_DIR), reverse=True) if os.path.isdir(profiling.PROFILE_DIR) else []
+if not profiles:
+    st.write("No profiles yet. Add ?profile=1 (or ?profile=mem for allocations too) to a page URL "
+             "to profile its next rerun.")
+else:
+    selected = st.selectbox("Profile file", profiles)
+    with open(os.path.join(profiling.PROFILE_DIR, selected), 'rb') as f:
+        st.download_button("Download", f.read(), file_name=selected)
+
+# --------------------------------------------------------------------------
+# 6. Start-up warm-up (GET /ready on the metrics port, .cache/ready.json)
+# --------------------------------------------------------------------------
+st.subheader("Warm-up")
+readiness = warmup.status()
+st.metric("Ready", "yes" if readiness['ready'] else "no")
+if readiness.get('steps'):
+    st.dataframe(pd.DataFrame([
+        {'step': name, 'seconds': secs, 'error': readiness['errors'].get(name, '')}
+        for name, secs in readiness['steps'].items()
+    ]), hide_index=True, use_container_width=True)